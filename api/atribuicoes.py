@@ -0,0 +1,160 @@
+"""
+Atribuições do professor (pares turma/disciplina) para a API.
+
+Carregadas com uma única query (TurmaDisciplina + turma + disciplina).
+Com cache compartilhado entre os workers (CACHE_BACKEND), ficam no cache
+por usuário e por um contador de versão que api/signals.py incrementa a
+cada mudança em TurmaDisciplina, Docente, Turma ou Disciplina. Com o
+locmem (um por processo) o incremento não chegaria aos outros workers,
+então o conjunto é carregado a cada request.
+
+As checagens de leitura são consultas a um frozenset, sem query. Os
+endpoints que gravam (chamada, notas) confirmam o vínculo no banco com
+confirmar(), que não depende do cache.
+"""
+
+from dataclasses import dataclass
+
+from django.core.cache import cache
+
+from core.cache import cache_compartilhado
+
+ATRIBUICOES_CACHE_TIMEOUT = 60 * 10
+
+_VERSAO_KEY = "api:atribuicoes:versao"
+
+_SEM_DOCENTE = "sem_docente"
+
+
+def invalidar_atribuicoes():
+    try:
+        cache.incr(_VERSAO_KEY)
+    except ValueError:
+        cache.set(_VERSAO_KEY, 1, None)
+
+
+def _int(valor):
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(frozen=True)
+class AtribuicoesDocente:
+    docente_id: int
+    docente_nome: str
+    escola_id: int
+    pares: frozenset
+    turma_ids: frozenset
+    # resposta pronta de minhas_turmas, na ordem turma/disciplina
+    turmas: tuple
+
+    def pode_turma(self, turma_id):
+        return _int(turma_id) in self.turma_ids
+
+    def pode(self, turma_id, disciplina_id):
+        return (_int(turma_id), _int(disciplina_id)) in self.pares
+
+    def confirmar(self, turma_id, disciplina_id):
+        """Checagem no banco, para os endpoints que gravam."""
+        from home.models import TurmaDisciplina
+
+        turma_id, disciplina_id = _int(turma_id), _int(disciplina_id)
+
+        if turma_id is None or disciplina_id is None:
+            return False
+
+        return TurmaDisciplina.objects.filter(
+            turma_id=turma_id,
+            disciplina_id=disciplina_id,
+            professor_id=self.docente_id,
+            escola_id=self.escola_id
+        ).exists()
+
+
+def _carregar(user):
+    from home.models import Docente, TurmaDisciplina
+
+    docente = (
+        Docente.objects
+        .filter(user=user, escola_id=user.escola_id)
+        .values("id", "nome")
+        .first()
+    )
+
+    if docente is None:
+        return None
+
+    vinculos = (
+        TurmaDisciplina.objects
+        .filter(professor_id=docente["id"], escola_id=user.escola_id)
+        .select_related("turma", "disciplina")
+        .order_by("turma__nome", "disciplina__nome")
+    )
+
+    pares = set()
+    turmas_map = {}
+
+    for vinculo in vinculos:
+        turma = vinculo.turma
+
+        pares.add((vinculo.turma_id, vinculo.disciplina_id))
+
+        if turma.id not in turmas_map:
+            turmas_map[turma.id] = {
+                "id": turma.id,
+                "nome": turma.nome,
+                "turno": turma.turno,
+                "ano": turma.ano,
+                "sala": turma.sala,
+                "sistema_avaliacao": turma.sistema_avaliacao,
+                "disciplinas": []
+            }
+
+        turmas_map[turma.id]["disciplinas"].append({
+            "id": vinculo.disciplina.id,
+            "nome": vinculo.disciplina.nome
+        })
+
+    return AtribuicoesDocente(
+        docente_id=docente["id"],
+        docente_nome=docente["nome"],
+        escola_id=user.escola_id,
+        pares=frozenset(pares),
+        turma_ids=frozenset(turmas_map),
+        turmas=tuple(turmas_map.values()),
+    )
+
+
+def atribuicoes_do_professor(user):
+    """
+    AtribuicoesDocente do usuário na escola dele, ou None se ele não tem
+    cadastro de Docente. Resolvido uma vez por request (memo no user) e,
+    com cache compartilhado, reaproveitado entre requests.
+    """
+
+    memo = user.__dict__.get("_atribuicoes")
+    if memo is not None:
+        return memo or None
+
+    if not cache_compartilhado():
+        atribuicoes = _carregar(user)
+        user._atribuicoes = atribuicoes or False
+        return atribuicoes
+
+    versao = cache.get(_VERSAO_KEY, 0)
+    key = f"api:atribuicoes:{user.pk}:{user.escola_id}:{versao}"
+
+    atribuicoes = cache.get(key)
+
+    if atribuicoes is None:
+        atribuicoes = _carregar(user) or _SEM_DOCENTE
+        cache.set(key, atribuicoes, ATRIBUICOES_CACHE_TIMEOUT)
+
+    if atribuicoes == _SEM_DOCENTE:
+        user._atribuicoes = False
+        return None
+
+    user._atribuicoes = atribuicoes
+    return atribuicoes
@@ -0,0 +1,95 @@
+"""
+Autenticação JWT da API com o usuário em cache.
+
+O JWTAuthentication padrão faz um SELECT em User a cada chamada e, nas
+views, user.escola faz outro. Aqui o usuário fica num cache em memória
+do processo (TTL curto), guardado por id junto com a versão do token:
+o claim "ver" emitido pelo CPFTokenObtainPairSerializer, derivado do
+hash da senha. Trocar a senha muda a versão e os tokens antigos deixam
+de valer, como acontece com a sessão do Django.
+
+Cada request recebe uma instância própria (Model.from_db, sem query),
+com a escola vinda do cache de tenant. Os sinais em api/signals.py
+descartam o usuário do cache deste processo depois do commit de um save;
+em outros processos a mudança aparece quando o TTL expira.
+"""
+
+from django.conf import settings
+from django.utils.crypto import salted_hmac
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from home.tenant import CacheTTL, escola_por_id
+
+JWT_USER_CACHE_TTL = getattr(settings, "JWT_USER_CACHE_TTL", 60)
+
+VERSAO_CLAIM = "ver"
+
+_usuarios = CacheTTL(maximo=1024, ttl=JWT_USER_CACHE_TTL)
+
+
+def versao_token(user):
+    return salted_hmac(
+        "api.authentication.versao_token",
+        user.password,
+        algorithm="sha256",
+    ).hexdigest()[:16]
+
+
+def _chave(user_id):
+    # o simplejwt 5.5 grava o claim user_id como string; os sinais passam
+    # o pk inteiro
+    return str(user_id)
+
+
+def invalidar_usuario(user_id):
+    _usuarios.pop(_chave(user_id))
+
+
+def _retrato(user):
+    campos = [f.attname for f in user._meta.concrete_fields]
+    return user._state.db, campos, [getattr(user, c) for c in campos]
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+
+    def get_user(self, validated_token):
+        # tokens emitidos antes do claim "ver": caminho padrão, sem cache
+        if VERSAO_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        versao = validated_token[VERSAO_CLAIM]
+
+        item = _usuarios.get(_chave(user_id))
+
+        if item is None or item[0] != versao:
+            try:
+                user = self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+            if versao_token(user) != versao:
+                raise AuthenticationFailed("Token revogado.", code="token_revoked")
+
+            item = (versao, _retrato(user))
+            _usuarios.set(_chave(user_id), item)
+
+        db, campos, valores = item[1]
+        user = self.user_model.from_db(db, campos, valores)
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        # 🔹 user.escola sem query
+        escola = escola_por_id(user.escola_id)
+        if escola is not None:
+            user.escola = escola
+
+        return user
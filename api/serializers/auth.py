@@ -1,27 +1,70 @@
 from django.contrib.auth import authenticate
 from rest_framework import serializers
+from rest_framework.exceptions import Throttled
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
+from api.authentication import VERSAO_CLAIM, versao_token
+
 
 class CPFTokenObtainPairSerializer(TokenObtainPairSerializer):
     username_field = "cpf"
 
+    @classmethod
+    def get_token(cls, user):
+        from home.models import Docente
+
+        token = super().get_token(user)
+
+        # copiados para o access token e mantidos no refresh
+        token["escola_id"] = user.escola_id
+        token["role"] = user.role
+        token["docente_id"] = (
+            Docente.objects
+            .filter(user=user, escola_id=user.escola_id)
+            .values_list("id", flat=True)
+            .first()
+        )
+        token[VERSAO_CLAIM] = versao_token(user)
+
+        return token
+
     def validate(self, attrs):
-        cpf = attrs.get("cpf")
+        from home.login_protecao import (
+            ip_do_cliente,
+            limpar_falhas,
+            login_bloqueado,
+            registrar_falha,
+            registrar_login_log,
+        )
+
+        request = self.context.get("request")
+
+        cpf = (attrs.get("cpf") or "").replace(".", "").replace("-", "")
         password = attrs.get("password")
+        ip = ip_do_cliente(request) if request is not None else None
+
+        # 🔒 mesmo limite de falhas do login_view: recusa antes do hash
+        if login_bloqueado(cpf, ip):
+            registrar_login_log(user=None, cpf=cpf, ip=ip, sucesso=False)
+            raise Throttled(detail="Muitas tentativas de login. Aguarde alguns minutos e tente novamente.")
 
         user = authenticate(
-            request=self.context.get("request"),
+            request=request,
             username=cpf,
             password=password,
         )
 
         if user is None:
+            registrar_falha(cpf, ip)
+            registrar_login_log(user=None, cpf=cpf, ip=ip, sucesso=False)
             raise serializers.ValidationError("CPF ou senha inválidos.")
 
         if not user.is_active:
             raise serializers.ValidationError("Usuário inativo.")
 
+        limpar_falhas(cpf)
+        registrar_login_log(user=user, cpf=cpf, ip=ip, sucesso=True)
+
         refresh = self.get_token(user)
 
         return {
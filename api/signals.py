@@ -0,0 +1,29 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from home.models import Disciplina, Docente, Turma, TurmaDisciplina, User
+
+from .atribuicoes import invalidar_atribuicoes
+from .authentication import invalidar_usuario
+
+
+# 🔹 cache de atribuições do professor (api/atribuicoes.py)
+# invalidado só depois do commit: antes disso outra request recarregaria
+# o cache com os dados antigos
+@receiver([post_save, post_delete], sender=TurmaDisciplina)
+@receiver([post_save, post_delete], sender=Docente)
+@receiver([post_save, post_delete], sender=Turma)
+@receiver([post_save, post_delete], sender=Disciplina)
+def invalidar_cache_atribuicoes(sender, instance, **kwargs):
+    transaction.on_commit(invalidar_atribuicoes, using=kwargs.get("using"))
+
+
+# 🔹 usuário em cache da autenticação JWT (api/authentication.py)
+@receiver([post_save, post_delete], sender=User)
+def invalidar_cache_usuario_jwt(sender, instance, **kwargs):
+    update_fields = kwargs.get("update_fields")
+    if update_fields and set(update_fields) <= {"last_login"}:
+        return
+    user_id = instance.pk
+    transaction.on_commit(lambda: invalidar_usuario(user_id), using=kwargs.get("using"))
@@ -1,3 +1,47 @@
 from django.test import TestCase
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
 
-# Create your tests here.
+from api.authentication import CachedJWTAuthentication, invalidar_usuario
+from api.serializers.auth import CPFTokenObtainPairSerializer
+from home.models import User
+
+
+class CachedJWTAuthenticationTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="professor",
+            password="senha-forte-123",
+            cpf="12345678901",
+        )
+        self.token = CPFTokenObtainPairSerializer.get_token(self.user).access_token
+        self.auth = CachedJWTAuthentication()
+        invalidar_usuario(self.user.pk)
+
+    def test_segunda_chamada_vem_do_cache(self):
+        self.auth.get_user(self.token)
+
+        with self.assertNumQueries(0):
+            self.auth.get_user(self.token)
+
+    def test_save_do_usuario_forca_recarga(self):
+        self.auth.get_user(self.token)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.first_name = "Maria"
+            self.user.save()
+
+        with self.assertNumQueries(1):
+            user = self.auth.get_user(self.token)
+
+        self.assertEqual(user.first_name, "Maria")
+
+    def test_usuario_desativado_deixa_de_autenticar(self):
+        self.auth.get_user(self.token)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.get_user(self.token)
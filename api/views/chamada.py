@@ -5,10 +5,9 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 
+from api.atribuicoes import atribuicoes_do_professor
 from home.models import (
-    Docente,
     Turma,
-    TurmaDisciplina,
     Disciplina,
     DiarioDeClasse,
     Chamada,
@@ -28,9 +27,9 @@ def salvar_chamada_api(request):
             "erro": "Apenas professores podem realizar chamada."
         }, status=status.HTTP_403_FORBIDDEN)
 
-    try:
-        docente = Docente.objects.get(user=user, escola=user.escola)
-    except Docente.DoesNotExist:
+    atribuicoes = atribuicoes_do_professor(user)
+
+    if atribuicoes is None:
         return Response({
             "ok": False,
             "erro": "Docente não encontrado para este usuário."
@@ -65,8 +64,14 @@ def salvar_chamada_api(request):
             "erro": "A lista de presenças é obrigatória."
         }, status=status.HTTP_400_BAD_REQUEST)
 
+    if not atribuicoes.confirmar(turma_id, disciplina_id):
+        return Response({
+            "ok": False,
+            "erro": "Você não tem permissão para lançar chamada nesta turma/disciplina."
+        }, status=status.HTTP_403_FORBIDDEN)
+
     try:
-        turma = Turma.objects.get(id=turma_id, escola=user.escola)
+        turma = Turma.objects.get(id=turma_id, escola_id=user.escola_id)
     except Turma.DoesNotExist:
         return Response({
             "ok": False,
@@ -74,26 +79,13 @@ def salvar_chamada_api(request):
         }, status=status.HTTP_404_NOT_FOUND)
 
     try:
-        disciplina = Disciplina.objects.get(id=disciplina_id, escola=user.escola)
+        disciplina = Disciplina.objects.get(id=disciplina_id, escola_id=user.escola_id)
     except Disciplina.DoesNotExist:
         return Response({
             "ok": False,
             "erro": "Disciplina não encontrada."
         }, status=status.HTTP_404_NOT_FOUND)
 
-    possui_vinculo = TurmaDisciplina.objects.filter(
-        turma=turma,
-        disciplina=disciplina,
-        professor=docente,
-        escola=user.escola
-    ).exists()
-
-    if not possui_vinculo:
-        return Response({
-            "ok": False,
-            "erro": "Você não tem permissão para lançar chamada nesta turma/disciplina."
-        }, status=status.HTTP_403_FORBIDDEN)
-
     status_validos = {"PLANEJADA", "REALIZADA", "CANCELADA", "INVALIDA"}
     if status_aula not in status_validos:
         return Response({
@@ -139,7 +131,7 @@ def salvar_chamada_api(request):
         diario = DiarioDeClasse.objects.create(
             turma=turma,
             disciplina=disciplina,
-            professor=docente,
+            professor_id=atribuicoes.docente_id,
             criado_por=user,
             data_ministrada=data_ministrada,
             hora_inicio=hora_inicio or None,
@@ -197,50 +189,28 @@ def consultar_chamada_api(request):
             "erro": "turma_id, disciplina_id e data_ministrada são obrigatórios."
         }, status=status.HTTP_400_BAD_REQUEST)
 
-    try:
-        docente = Docente.objects.get(user=user, escola=user.escola)
-    except Docente.DoesNotExist:
-        return Response({
-            "ok": False,
-            "erro": "Docente não encontrado para este usuário."
-        }, status=status.HTTP_404_NOT_FOUND)
-
-    try:
-        turma = Turma.objects.get(id=turma_id, escola=user.escola)
-    except Turma.DoesNotExist:
-        return Response({
-            "ok": False,
-            "erro": "Turma não encontrada."
-        }, status=status.HTTP_404_NOT_FOUND)
+    atribuicoes = atribuicoes_do_professor(user)
 
-    try:
-        disciplina = Disciplina.objects.get(id=disciplina_id, escola=user.escola)
-    except Disciplina.DoesNotExist:
+    if atribuicoes is None:
         return Response({
             "ok": False,
-            "erro": "Disciplina não encontrada."
+            "erro": "Docente não encontrado para este usuário."
         }, status=status.HTTP_404_NOT_FOUND)
 
-    possui_vinculo = TurmaDisciplina.objects.filter(
-        turma=turma,
-        disciplina=disciplina,
-        professor=docente,
-        escola=user.escola
-    ).exists()
-
-    if not possui_vinculo:
+    if not atribuicoes.pode(turma_id, disciplina_id):
         return Response({
             "ok": False,
             "erro": "Você não tem permissão para consultar chamada nesta turma/disciplina."
         }, status=status.HTTP_403_FORBIDDEN)
 
+    # turma e disciplina da resposta vêm do select_related do diário
     diario = (
         DiarioDeClasse.objects
         .filter(
-            turma=turma,
-            disciplina=disciplina,
-            professor=docente,
-            escola=user.escola,
+            turma_id=turma_id,
+            disciplina_id=disciplina_id,
+            professor_id=atribuicoes.docente_id,
+            escola_id=user.escola_id,
             data_ministrada=data_ministrada
         )
         .select_related("turma", "disciplina", "professor")
@@ -255,6 +225,9 @@ def consultar_chamada_api(request):
             "mensagem": "Nenhuma chamada encontrada para os filtros informados."
         }, status=status.HTTP_200_OK)
 
+    turma = diario.turma
+    disciplina = diario.disciplina
+
     chamada = Chamada.objects.filter(diario=diario).first()
 
     presencas_data = []
@@ -320,9 +293,9 @@ def atualizar_chamada_api(request, diario_id):
             "erro": "Apenas professores podem atualizar chamada."
         }, status=status.HTTP_403_FORBIDDEN)
 
-    try:
-        docente = Docente.objects.get(user=user, escola=user.escola)
-    except Docente.DoesNotExist:
+    atribuicoes = atribuicoes_do_professor(user)
+
+    if atribuicoes is None:
         return Response({
             "ok": False,
             "erro": "Docente não encontrado para este usuário."
@@ -331,8 +304,8 @@ def atualizar_chamada_api(request, diario_id):
     try:
         diario = DiarioDeClasse.objects.select_related("turma", "disciplina").get(
             id=diario_id,
-            escola=user.escola,
-            professor=docente
+            escola_id=user.escola_id,
+            professor_id=atribuicoes.docente_id
         )
     except DiarioDeClasse.DoesNotExist:
         return Response({
@@ -340,14 +313,7 @@ def atualizar_chamada_api(request, diario_id):
             "erro": "Diário não encontrado."
         }, status=status.HTTP_404_NOT_FOUND)
 
-    possui_vinculo = TurmaDisciplina.objects.filter(
-        turma=diario.turma,
-        disciplina=diario.disciplina,
-        professor=docente,
-        escola=user.escola
-    ).exists()
-
-    if not possui_vinculo:
+    if not atribuicoes.confirmar(diario.turma_id, diario.disciplina_id):
         return Response({
             "ok": False,
             "erro": "Você não tem permissão para atualizar esta chamada."
@@ -5,10 +5,9 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 
+from api.atribuicoes import atribuicoes_do_professor
 from home.models import (
-    Docente,
     Turma,
-    TurmaDisciplina,
     Avaliacao,
     Nota,
     Aluno,
@@ -36,35 +35,28 @@ def listar_avaliacoes_api(request):
             "erro": "turma_id, disciplina_id e bimestre são obrigatórios."
         }, status=status.HTTP_400_BAD_REQUEST)
 
-    try:
-        docente = Docente.objects.get(user=user, escola=user.escola)
-    except Docente.DoesNotExist:
+    atribuicoes = atribuicoes_do_professor(user)
+
+    if atribuicoes is None:
         return Response({
             "ok": False,
             "erro": "Docente não encontrado para este usuário."
         }, status=status.HTTP_404_NOT_FOUND)
 
+    if not atribuicoes.pode(turma_id, disciplina_id):
+        return Response({
+            "ok": False,
+            "erro": "Você não tem permissão para acessar avaliações desta turma/disciplina."
+        }, status=status.HTTP_403_FORBIDDEN)
+
     try:
-        turma = Turma.objects.get(id=turma_id, escola=user.escola)
+        turma = Turma.objects.get(id=turma_id, escola_id=user.escola_id)
     except Turma.DoesNotExist:
         return Response({
             "ok": False,
             "erro": "Turma não encontrada."
         }, status=status.HTTP_404_NOT_FOUND)
 
-    possui_vinculo = TurmaDisciplina.objects.filter(
-        turma=turma,
-        disciplina_id=disciplina_id,
-        professor=docente,
-        escola=user.escola
-    ).exists()
-
-    if not possui_vinculo:
-        return Response({
-            "ok": False,
-            "erro": "Você não tem permissão para acessar avaliações desta turma/disciplina."
-        }, status=status.HTTP_403_FORBIDDEN)
-
     avaliacoes = (
         Avaliacao.objects
         .filter(
@@ -128,35 +120,28 @@ def consultar_notas_api(request):
             "erro": "turma_id, disciplina_id e bimestre são obrigatórios."
         }, status=status.HTTP_400_BAD_REQUEST)
 
-    try:
-        docente = Docente.objects.get(user=user, escola=user.escola)
-    except Docente.DoesNotExist:
+    atribuicoes = atribuicoes_do_professor(user)
+
+    if atribuicoes is None:
         return Response({
             "ok": False,
             "erro": "Docente não encontrado para este usuário."
         }, status=status.HTTP_404_NOT_FOUND)
 
+    if not atribuicoes.pode(turma_id, disciplina_id):
+        return Response({
+            "ok": False,
+            "erro": "Você não tem permissão para acessar notas desta turma/disciplina."
+        }, status=status.HTTP_403_FORBIDDEN)
+
     try:
-        turma = Turma.objects.get(id=turma_id, escola=user.escola)
+        turma = Turma.objects.get(id=turma_id, escola_id=user.escola_id)
     except Turma.DoesNotExist:
         return Response({
             "ok": False,
             "erro": "Turma não encontrada."
         }, status=status.HTTP_404_NOT_FOUND)
 
-    possui_vinculo = TurmaDisciplina.objects.filter(
-        turma=turma,
-        disciplina_id=disciplina_id,
-        professor=docente,
-        escola=user.escola
-    ).exists()
-
-    if not possui_vinculo:
-        return Response({
-            "ok": False,
-            "erro": "Você não tem permissão para acessar notas desta turma/disciplina."
-        }, status=status.HTTP_403_FORBIDDEN)
-
     avaliacoes = list(
         Avaliacao.objects.filter(
             disciplina_id=disciplina_id,
@@ -253,9 +238,9 @@ def salvar_notas_api(request):
             "erro": "Apenas professores podem lançar notas."
         }, status=status.HTTP_403_FORBIDDEN)
 
-    try:
-        docente = Docente.objects.get(user=user, escola=user.escola)
-    except Docente.DoesNotExist:
+    atribuicoes = atribuicoes_do_professor(user)
+
+    if atribuicoes is None:
         return Response({
             "ok": False,
             "erro": "Docente não encontrado para este usuário."
@@ -279,14 +264,6 @@ def salvar_notas_api(request):
             "erro": "A lista de notas é obrigatória."
         }, status=status.HTTP_400_BAD_REQUEST)
 
-    try:
-        turma = Turma.objects.get(id=turma_id, escola=user.escola)
-    except Turma.DoesNotExist:
-        return Response({
-            "ok": False,
-            "erro": "Turma não encontrada."
-        }, status=status.HTTP_404_NOT_FOUND)
-
     try:
         avaliacao = Avaliacao.objects.select_related("disciplina").get(
             id=avaliacao_id,
@@ -298,19 +275,20 @@ def salvar_notas_api(request):
             "erro": "Avaliação não encontrada."
         }, status=status.HTTP_404_NOT_FOUND)
 
-    possui_vinculo = TurmaDisciplina.objects.filter(
-        turma=turma,
-        disciplina=avaliacao.disciplina,
-        professor=docente,
-        escola=user.escola
-    ).exists()
-
-    if not possui_vinculo:
+    if not atribuicoes.confirmar(turma_id, avaliacao.disciplina_id):
         return Response({
             "ok": False,
             "erro": "Você não tem permissão para lançar notas nesta turma/disciplina."
         }, status=status.HTTP_403_FORBIDDEN)
 
+    try:
+        turma = Turma.objects.get(id=turma_id, escola_id=user.escola_id)
+    except Turma.DoesNotExist:
+        return Response({
+            "ok": False,
+            "erro": "Turma não encontrada."
+        }, status=status.HTTP_404_NOT_FOUND)
+
     alunos_ids_turma = set(
         turma.alunos.filter(escola=user.escola, ativo=True).values_list("id", flat=True)
     )
@@ -3,11 +3,8 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 
-from home.models import (
-    Docente,
-    Turma,
-    TurmaDisciplina,
-)
+from api.atribuicoes import atribuicoes_do_professor
+from home.models import Turma
 
 
 @api_view(["GET"])
@@ -21,49 +18,18 @@ def minhas_turmas(request):
             "erro": "Apenas professores podem acessar este endpoint."
         }, status=status.HTTP_403_FORBIDDEN)
 
-    try:
-        docente = Docente.objects.get(user=user, escola=user.escola)
-    except Docente.DoesNotExist:
+    atribuicoes = atribuicoes_do_professor(user)
+
+    if atribuicoes is None:
         return Response({
             "ok": False,
             "erro": "Docente não encontrado para este usuário."
         }, status=status.HTTP_404_NOT_FOUND)
 
-    vinculos = (
-        TurmaDisciplina.objects
-        .filter(
-            professor=docente,
-            escola=user.escola
-        )
-        .select_related("turma", "disciplina")
-        .order_by("turma__nome", "disciplina__nome")
-    )
-
-    turmas_map = {}
-
-    for vinculo in vinculos:
-        turma = vinculo.turma
-
-        if turma.id not in turmas_map:
-            turmas_map[turma.id] = {
-                "id": turma.id,
-                "nome": turma.nome,
-                "turno": turma.turno,
-                "ano": turma.ano,
-                "sala": turma.sala,
-                "sistema_avaliacao": turma.sistema_avaliacao,
-                "disciplinas": []
-            }
-
-        turmas_map[turma.id]["disciplinas"].append({
-            "id": vinculo.disciplina.id,
-            "nome": vinculo.disciplina.nome
-        })
-
     return Response({
         "ok": True,
-        "professor": docente.nome,
-        "turmas": list(turmas_map.values())
+        "professor": atribuicoes.docente_nome,
+        "turmas": list(atribuicoes.turmas)
     }, status=status.HTTP_200_OK)
 
 
@@ -78,34 +44,28 @@ def alunos_da_turma(request, turma_id):
             "erro": "Apenas professores podem acessar este endpoint."
         }, status=status.HTTP_403_FORBIDDEN)
 
-    try:
-        docente = Docente.objects.get(user=user, escola=user.escola)
-    except Docente.DoesNotExist:
+    atribuicoes = atribuicoes_do_professor(user)
+
+    if atribuicoes is None:
         return Response({
             "ok": False,
             "erro": "Docente não encontrado para este usuário."
         }, status=status.HTTP_404_NOT_FOUND)
 
+    if not atribuicoes.pode_turma(turma_id):
+        return Response({
+            "ok": False,
+            "erro": "Você não tem permissão para acessar esta turma."
+        }, status=status.HTTP_403_FORBIDDEN)
+
     try:
-        turma = Turma.objects.get(id=turma_id, escola=user.escola)
+        turma = Turma.objects.get(id=turma_id, escola_id=user.escola_id)
     except Turma.DoesNotExist:
         return Response({
             "ok": False,
             "erro": "Turma não encontrada."
         }, status=status.HTTP_404_NOT_FOUND)
 
-    possui_vinculo = TurmaDisciplina.objects.filter(
-        turma=turma,
-        professor=docente,
-        escola=user.escola
-    ).exists()
-
-    if not possui_vinculo:
-        return Response({
-            "ok": False,
-            "erro": "Você não tem permissão para acessar esta turma."
-        }, status=status.HTTP_403_FORBIDDEN)
-
     alunos = turma.alunos.filter(
         escola=user.escola
     ).order_by("nome")
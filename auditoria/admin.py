@@ -9,4 +9,6 @@ class LogAuditoriaAdmin(admin.ModelAdmin):
     list_display = ('usuario', 'acao', 'modelo', 'objeto_id', 'data_hora')
     list_filter = ('acao', 'modelo', 'data_hora')
     search_fields = ('descricao', 'usuario__username')
-    ordering = ('-data_hora',)
\ No newline at end of file
+    ordering = ('-data_hora',)
+    # evita o COUNT(*) sem filtro a cada página
+    show_full_result_count = False
\ No newline at end of file
@@ -0,0 +1,126 @@
+# auditoria/buffer.py
+
+import atexit
+import logging
+import queue
+import threading
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from auditoria.models import LogAuditoria
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_LOTE = 500
+
+# logs já confirmados da request corrente (None fora de request)
+_buffer = ContextVar("auditoria_buffer", default=None)
+
+_fila = None
+_fila_lock = threading.Lock()
+
+
+# 🔹 ESCOPO DA REQUEST (aberto/fechado pelo AuditoriaMiddleware)
+def iniciar():
+    return _buffer.set([])
+
+
+def encerrar(token):
+    """Fecha o escopo e devolve os logs acumulados (sem tocar no banco)."""
+    logs = _buffer.get()
+    _buffer.reset(token)
+    return logs or []
+
+
+def descarregar(token):
+    """Grava de uma vez os logs confirmados durante a request."""
+    gravar(encerrar(token))
+
+
+# 🔹 ENTRADA
+def registrar(log, using=None):
+    """
+    Agenda o LogAuditoria para depois do commit da transação corrente.
+    Se ela for desfeita (inclusive um savepoint), o Django descarta o
+    callback e a alteração não é logada. Fora de transação, o commit já
+    aconteceu e o log entra no buffer na hora.
+    """
+    transaction.on_commit(lambda: _confirmado(log), using=using)
+
+
+def _confirmado(log):
+    buffer = _buffer.get()
+
+    # comandos/shell: sem request, grava direto
+    if buffer is None:
+        gravar([log])
+    else:
+        buffer.append(log)
+
+
+# 🔹 GRAVAÇÃO
+def gravar(logs):
+    if not logs:
+        return
+
+    if getattr(settings, "AUDITORIA_ESCRITA_ASSINCRONA", False):
+        _get_fila().put(logs)
+    else:
+        _bulk_create(logs)
+
+
+def _bulk_create(logs):
+    # os dados auditados já foram commitados: uma falha aqui não deve
+    # derrubar a request, só ficar registrada
+    try:
+        LogAuditoria.objects.bulk_create(logs, batch_size=TAMANHO_LOTE)
+    except Exception:
+        logger.exception("Falha ao gravar %s logs de auditoria", len(logs))
+
+
+# 🔹 ESCRITOR EM SEGUNDO PLANO (AUDITORIA_ESCRITA_ASSINCRONA = True)
+def _get_fila():
+    global _fila
+
+    with _fila_lock:
+        if _fila is None:
+            _fila = queue.Queue()
+            threading.Thread(
+                target=_escritor,
+                name="auditoria-escritor",
+                daemon=True,
+            ).start()
+            atexit.register(_esvaziar_fila)
+
+    return _fila
+
+
+def _proximo_lote(primeiro):
+    """Junta ao lote o que já estiver na fila, até TAMANHO_LOTE."""
+    logs = list(primeiro)
+
+    while len(logs) < TAMANHO_LOTE:
+        try:
+            logs.extend(_fila.get_nowait())
+        except queue.Empty:
+            break
+
+    return logs
+
+
+def _escritor():
+    while True:
+        logs = _proximo_lote(_fila.get())
+        _bulk_create(logs)
+        close_old_connections()
+
+
+def _esvaziar_fila():
+    # na saída do processo a thread daemon morre; grava o que sobrou
+    while True:
+        try:
+            _bulk_create(_proximo_lote(_fila.get_nowait()))
+        except queue.Empty:
+            break
@@ -1,10 +1,31 @@
 # auditoria/management/commands/limpar_logs.py
 
-from django.core.management.base import BaseCommand
-from django.utils import timezone
+import gzip
+import json
+from collections import defaultdict
 from datetime import timedelta
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
 
 from auditoria.models import LogAuditoria
+from auditoria.utils import particoes
+
+
+CAMPOS_ARQUIVO = (
+    "id",
+    "data_hora",
+    "usuario_id",
+    "acao",
+    "modelo",
+    "objeto_id",
+    "descricao",
+    "ip",
+    "alteracoes",
+)
 
 
 class Command(BaseCommand):
@@ -17,20 +38,105 @@ class Command(BaseCommand):
             default=90,
             help='Quantidade de dias para manter os logs (default: 90)'
         )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=5000,
+            help='Logs removidos por transação (default: 5000)'
+        )
+        parser.add_argument(
+            '--arquivar',
+            metavar='DIRETORIO',
+            help='Antes de remover, grava os logs em DIRETORIO/AAAA/MM/logs-AAAA-MM-DD.jsonl.gz'
+        )
+        parser.add_argument(
+            '--particionar',
+            action='store_true',
+            help='(PostgreSQL) converte a tabela em particionada por mês; rodar uma vez, em manutenção'
+        )
+
+    # 🔹 ARQUIVO JSONL COMPACTADO, UM POR DIA
+    def _arquivar(self, diretorio, registros):
+
+        por_dia = defaultdict(list)
+        for registro in registros:
+            por_dia[timezone.localtime(registro["data_hora"]).date()].append(registro)
+
+        for dia, linhas in por_dia.items():
+            pasta = Path(diretorio) / f"{dia:%Y}" / f"{dia:%m}"
+            pasta.mkdir(parents=True, exist_ok=True)
+
+            # "at" acrescenta um novo membro gzip: o arquivo continua válido
+            with gzip.open(pasta / f"logs-{dia:%Y-%m-%d}.jsonl.gz", "at", encoding="utf-8") as arquivo:
+                for linha in linhas:
+                    arquivo.write(json.dumps(linha, cls=DjangoJSONEncoder, ensure_ascii=False))
+                    arquivo.write("\n")
+
+    # 🔹 REMOÇÃO EM LOTES DELIMITADOS PELA PK
+    def _remover_em_lotes(self, limite, lote, diretorio):
+
+        antigos = LogAuditoria.objects.filter(data_hora__lt=limite).order_by("id")
+        ultimo_id = 0
+        total = 0
+
+        while True:
+
+            if diretorio:
+                registros = list(antigos.filter(id__gt=ultimo_id).values(*CAMPOS_ARQUIVO)[:lote])
+                ids = [r["id"] for r in registros]
+            else:
+                ids = list(antigos.filter(id__gt=ultimo_id).values_list("id", flat=True)[:lote])
+
+            if not ids:
+                break
+
+            if diretorio:
+                self._arquivar(diretorio, registros)
+
+            # cada lote na sua transação: locks e WAL curtos
+            with transaction.atomic():
+                removidos, _ = LogAuditoria.objects.filter(
+                    id__gte=ids[0],
+                    id__lte=ids[-1],
+                    data_hora__lt=limite,
+                ).delete()
+
+            ultimo_id = ids[-1]
+            total += removidos
+
+        return total
 
     def handle(self, *args, **options):
 
         dias = options['dias']
+        lote = max(1, options['lote'])
+        diretorio = options['arquivar']
         limite = timezone.now() - timedelta(days=dias)
 
-        logs_antigos = LogAuditoria.objects.filter(data_hora__lt=limite)
+        if options['particionar']:
+            if not particoes.suportado():
+                raise CommandError("Particionamento disponível apenas no PostgreSQL.")
+            if not particoes.tabela_particionada():
+                particoes.particionar()
+                self.stdout.write("Tabela de logs convertida em particionada por mês.")
 
-        total = logs_antigos.count()
+        particionada = particoes.tabela_particionada()
 
-        logs_antigos.delete()
+        # sem arquivo, meses inteiros saem num DROP de partição
+        if particionada and not diretorio:
+            for nome in particoes.remover_particoes_ate(limite):
+                self.stdout.write(f"Partição removida: {nome}")
+
+        total = self._remover_em_lotes(limite, lote, diretorio)
+
+        if particionada:
+            # partições já esvaziadas pelo arquivamento + as dos próximos meses
+            particoes.remover_particoes_ate(limite)
+            for mes in particoes.garantir_particoes():
+                self.stderr.write(f"Partição de {mes:%m/%Y} não criada (ver log).")
 
         self.stdout.write(
             self.style.SUCCESS(
-                f"{total} logs antigos removidos (>{dias} dias)"
+                f"{total} logs antigos removidos em lotes (>{dias} dias)"
             )
-        )
\ No newline at end of file
+        )
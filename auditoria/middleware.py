@@ -1,20 +1,77 @@
 # auditoria/middleware.py
 
-import threading
+from contextvars import ContextVar
 
-_user = threading.local()
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+
+from auditoria import buffer
+from auditoria.utils.logs import get_client_ip
+
+# Request corrente por contexto (thread no WSGI, task no ASGI). Usuário,
+# IP e escola são lidos dela sob demanda: request.escola só é preenchida
+# pelo EscolaAtivaMiddleware, que roda depois deste.
+_request = ContextVar("auditoria_request", default=None)
+
+
+def get_current_request():
+    return _request.get()
 
 
 def get_current_user():
-    return getattr(_user, 'value', None)
+    request = _request.get()
+    return getattr(request, "user", None)
+
+
+def get_current_ip():
+    request = _request.get()
+    return get_client_ip(request) if request is not None else None
+
+
+def get_current_escola():
+    request = _request.get()
+    return getattr(request, "escola", None)
 
 
 class AuditoriaMiddleware:
 
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
 
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
     def __call__(self, request):
-        _user.value = request.user
-        response = self.get_response(request)
-        return response
\ No newline at end of file
+
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        token = _request.set(request)
+        token_buffer = buffer.iniciar()
+
+        try:
+            response = self.get_response(request)
+        finally:
+            # um único bulk_create com os logs confirmados na request
+            buffer.descarregar(token_buffer)
+            _request.reset(token)
+
+        return response
+
+    async def __acall__(self, request):
+
+        token = _request.set(request)
+        token_buffer = buffer.iniciar()
+
+        try:
+            response = await self.get_response(request)
+        finally:
+            # o reset das ContextVars fica neste contexto; só a escrita
+            # vai para a thread síncrona
+            logs = buffer.encerrar(token_buffer)
+            _request.reset(token)
+            await sync_to_async(buffer.gravar)(logs)
+
+        return response
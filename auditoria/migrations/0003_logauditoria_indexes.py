@@ -0,0 +1,25 @@
+# Generated by Django 5.0.7 on 2026-10-19 14:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auditoria', '0002_logauditoria_alteracoes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='logauditoria',
+            index=models.Index(fields=['modelo', 'objeto_id', 'data_hora'], name='logaud_modelo_objeto_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='logauditoria',
+            index=models.Index(fields=['usuario', 'data_hora'], name='logaud_usuario_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='logauditoria',
+            index=models.Index(fields=['data_hora', 'id'], name='logaud_data_id_idx'),
+        ),
+    ]
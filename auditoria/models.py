@@ -35,4 +35,14 @@ class LogAuditoria(models.Model):
     alteracoes = models.JSONField(null=True, blank=True)
 
     def __str__(self):
-        return f"{self.usuario} - {self.acao} - {self.data_hora}"
\ No newline at end of file
+        return f"{self.usuario} - {self.acao} - {self.data_hora}"
+
+    class Meta:
+
+        # consultas da tela de auditoria (auditoria/views.py), todas
+        # paginadas por (data_hora, id)
+        indexes = [
+            models.Index(fields=["modelo", "objeto_id", "data_hora"], name="logaud_modelo_objeto_idx"),
+            models.Index(fields=["usuario", "data_hora"], name="logaud_usuario_data_idx"),
+            models.Index(fields=["data_hora", "id"], name="logaud_data_id_idx"),
+        ]
@@ -0,0 +1,144 @@
+# auditoria/querysets.py
+#
+# update(), bulk_create() e bulk_update() não disparam pre_save/post_save,
+# então passam por fora de auditoria.signals. Models que usam
+# AuditoriaQuerySet (ou AuditoriaQuerySet.as_manager()) gravam UM log
+# resumido por operação em lote, com os ids afetados e os campos
+# alterados.
+
+from contextvars import ContextVar
+
+from django.db import models, transaction
+
+# máximo de ids/valores guardados no resumo (o total vai sempre)
+LIMITE_IDS = 1000
+LIMITE_VALORES = 20
+
+# bulk_update chama update() por dentro: evita log duplicado
+_em_lote = ContextVar("auditoria_em_lote", default=False)
+
+
+def _texto(valor):
+    try:
+        return str(valor)
+    except Exception:
+        return None
+
+
+def _distintos(valores):
+    vistos = []
+    for valor in map(_texto, valores):
+        if valor not in vistos:
+            vistos.append(valor)
+            if len(vistos) >= LIMITE_VALORES:
+                break
+    return vistos
+
+
+def registrar_lote(model, acao, ids, campos, total=None, using=None):
+    """Grava o LogAuditoria resumido de uma operação em lote."""
+
+    from auditoria.buffer import registrar
+    from auditoria.middleware import get_current_ip, get_current_user
+    from auditoria.models import LogAuditoria
+    from auditoria.signals import should_skip
+
+    total = len(ids) if total is None else total
+
+    if should_skip(model) or not total:
+        return
+
+    usuario = get_current_user()
+    nome = model.__name__
+
+    registrar(LogAuditoria(
+        usuario=usuario if usuario and usuario.is_authenticated else None,
+        acao=acao,
+        modelo=nome,
+        objeto_id=_texto(ids[0]) if total == 1 and ids else None,
+        descricao=f"{acao} em lote em {nome} ({total} registros)",
+        ip=get_current_ip(),
+        alteracoes={
+            "lote": True,
+            "total": total,
+            "ids": [_texto(i) for i in ids[:LIMITE_IDS]],
+            "campos": campos,
+        },
+    ), using=using)
+
+
+class AuditoriaQuerySet(models.QuerySet):
+
+    def update(self, **kwargs):
+
+        if _em_lote.get():
+            return super().update(**kwargs)
+
+        campos = list(kwargs)
+
+        with transaction.atomic(using=self.db):
+
+            # uma leitura dos valores atuais, só dos campos alterados
+            antes = list(self.values_list("pk", *campos))
+
+            linhas = super().update(**kwargs)
+
+        registrar_lote(
+            self.model,
+            "UPDATE",
+            [linha[0] for linha in antes],
+            {
+                campo: {
+                    "antes": _distintos(linha[i + 1] for linha in antes),
+                    "depois": _texto(valor),
+                }
+                for i, (campo, valor) in enumerate(kwargs.items())
+            },
+            using=self.db,
+        )
+
+        return linhas
+
+    def bulk_create(self, objs, *args, **kwargs):
+
+        objs = super().bulk_create(objs, *args, **kwargs)
+
+        # com ignore_conflicts o banco não devolve as pks
+        ids = [obj.pk for obj in objs if obj.pk is not None]
+
+        registrar_lote(
+            self.model,
+            "CREATE",
+            ids,
+            {},
+            total=len(objs),
+            using=self.db,
+        )
+
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+
+        objs = list(objs)
+
+        token = _em_lote.set(True)
+        try:
+            linhas = super().bulk_update(objs, fields, *args, **kwargs)
+        finally:
+            _em_lote.reset(token)
+
+        # attname: FK pelo id, sem carregar o objeto relacionado
+        attnames = {campo: self.model._meta.get_field(campo).attname for campo in fields}
+
+        registrar_lote(
+            self.model,
+            "UPDATE",
+            [obj.pk for obj in objs],
+            {
+                campo: {"depois": _distintos(getattr(obj, attname) for obj in objs)}
+                for campo, attname in attnames.items()
+            },
+            using=self.db,
+        )
+
+        return linhas
@@ -1,11 +1,15 @@
 # auditoria/signals.py
 
-from django.db.models.signals import pre_save, post_save, post_delete
+from functools import lru_cache
+
+from django.db.models import Model
+from django.db.models.signals import post_init, pre_save, post_save, post_delete
 from django.dispatch import receiver
 
+from auditoria.buffer import registrar
 from auditoria.models import LogAuditoria
-from auditoria.middleware import get_current_user
-from auditoria.utils.serializer import model_to_dict
+from auditoria.middleware import get_current_ip, get_current_user
+from auditoria.utils.serializer import como_texto, valores_carregados
 
 # 🔹 MODELS QUE NÃO DEVEM SER LOGADOS
 EXCLUDED_MODELS = [
@@ -32,7 +36,8 @@ def model_name(instance):
     return instance.__class__.__name__
 
 
-# 🔹 FUNÇÃO CENTRAL DE FILTRO
+# 🔹 FUNÇÃO CENTRAL DE FILTRO (memoizada: roda a cada post_init)
+@lru_cache(maxsize=None)
 def should_skip(sender):
     app_label = sender._meta.app_label
     model_name_sender = sender.__name__
@@ -46,6 +51,46 @@ def should_skip(sender):
     return False
 
 
+# 🔹 RETRATO AO CARREGAR (sem query e sem str(): cópia rasa dos valores
+# vindos do banco; a conversão para texto só acontece no save, e só dos
+# campos alterados)
+@receiver(post_init)
+def snapshot_data(sender, instance, **kwargs):
+
+    if should_skip(sender):
+        return
+
+    instance._old_data = valores_carregados(instance) if instance.pk is not None else None
+
+
+# 🔹 refresh_from_db copia os valores do banco para a instância sem novo
+# post_init: atualiza o retrato dos campos recarregados
+_refresh_from_db = Model.refresh_from_db
+
+
+def _refresh_from_db_auditado(self, *args, **kwargs):
+    _refresh_from_db(self, *args, **kwargs)
+
+    old_data = getattr(self, "_old_data", None)
+    if old_data is None:
+        return
+
+    fields = kwargs.get("fields", args[1] if len(args) > 1 else None)
+    atuais = valores_carregados(self)
+
+    if fields is None:
+        old_data.update(atuais)
+        return
+
+    for nome in fields:
+        nome = self._meta.get_field(nome).name
+        if nome in atuais:
+            old_data[nome] = atuais[nome]
+
+
+Model.refresh_from_db = _refresh_from_db_auditado
+
+
 # 🔹 CAPTURA ESTADO ANTES
 @receiver(pre_save)
 def capture_old_data(sender, instance, **kwargs):
@@ -57,11 +102,13 @@ def capture_old_data(sender, instance, **kwargs):
         instance._old_data = None
         return
 
-    try:
-        old_instance = sender.objects.get(pk=instance.pk)
-        instance._old_data = model_to_dict(old_instance)
-    except sender.DoesNotExist:
-        instance._old_data = None
+    # Veio do banco (ou já foi salva): o retrato do post_init vale
+    if not instance._state.adding and hasattr(instance, "_old_data"):
+        return
+
+    # Instância montada à mão com pk: único caso que ainda consulta o banco
+    old_instance = sender._base_manager.filter(pk=instance.pk).first()
+    instance._old_data = old_instance._old_data if old_instance else None
 
 
 # 🔹 SALVA LOG COM DIFERENÇA
@@ -73,18 +120,24 @@ def log_save(sender, instance, created, **kwargs):
 
     usuario = get_current_user()
 
-    new_data = model_to_dict(instance)
+    new_data = valores_carregados(instance)
     old_data = getattr(instance, "_old_data", None)
 
     alteracoes = {}
 
+    # próximo save compara com o que acabou de ser gravado
+    instance._old_data = new_data
+
     if old_data:
         for key in new_data:
-            if old_data.get(key) != new_data.get(key):
-                alteracoes[key] = {
-                    "antes": old_data.get(key),
-                    "depois": new_data.get(key),
-                }
+            if key not in old_data or old_data[key] == new_data[key]:
+                continue
+
+            # valor atribuído como texto (ex.: data vinda de form) e
+            # gravado igual não conta como alteração
+            antes, depois = como_texto(old_data[key]), como_texto(new_data[key])
+            if antes != depois:
+                alteracoes[key] = {"antes": antes, "depois": depois}
 
     # 🔥 evita log de update sem alteração
     if not created and not alteracoes:
@@ -92,14 +145,15 @@ def log_save(sender, instance, created, **kwargs):
 
     acao = "CREATE" if created else "UPDATE"
 
-    LogAuditoria.objects.create(
+    registrar(LogAuditoria(
         usuario=usuario if usuario and usuario.is_authenticated else None,
         acao=acao,
         modelo=model_name(instance),
         objeto_id=str(instance.pk),
+        ip=get_current_ip(),
         descricao=f"{acao} em {model_name(instance)} (ID: {instance.pk})",
         alteracoes=alteracoes if alteracoes else None,
-    )
+    ), using=kwargs.get("using"))
 
 
 # 🔹 DELETE
@@ -111,10 +165,11 @@ def log_delete(sender, instance, **kwargs):
 
     usuario = get_current_user()
 
-    LogAuditoria.objects.create(
+    registrar(LogAuditoria(
         usuario=usuario if usuario and usuario.is_authenticated else None,
         acao="DELETE",
         modelo=model_name(instance),
         objeto_id=str(instance.pk),
+        ip=get_current_ip(),
         descricao=f"DELETE em {model_name(instance)} (ID: {instance.pk})",
-    )
+    ), using=kwargs.get("using"))
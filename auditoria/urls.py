@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import logs_auditoria, api_logs_auditoria
+
+urlpatterns = [
+    path("logs/", logs_auditoria, name="logs_auditoria"),
+    path("api/logs/", api_logs_auditoria, name="api_logs_auditoria"),
+]
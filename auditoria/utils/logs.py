@@ -1,18 +1,19 @@
 # auditoria/utils/logs.py
 
+from auditoria.buffer import registrar
 from auditoria.models import LogAuditoria
 
 
 def registrar_log(request, acao, descricao, modelo=None, objeto_id=None):
 
-    LogAuditoria.objects.create(
+    registrar(LogAuditoria(
         usuario=request.user if request.user.is_authenticated else None,
         acao=acao,
         descricao=descricao,
         modelo=modelo,
         objeto_id=objeto_id,
         ip=get_client_ip(request),
-    )
+    ))
 
 
 def get_client_ip(request):
@@ -0,0 +1,240 @@
+# auditoria/utils/particoes.py
+#
+# Particionamento mensal de LogAuditoria por data_hora (só PostgreSQL).
+# Com a tabela particionada, expirar logs vira DROP de partição.
+
+import logging
+from datetime import date
+
+from django.db import DatabaseError, connection, transaction
+
+from auditoria.models import LogAuditoria
+
+logger = logging.getLogger(__name__)
+
+TABELA = LogAuditoria._meta.db_table
+DEFAULT = f"{TABELA}_default"
+
+
+def _mes_seguinte(dia):
+    if dia.month == 12:
+        return date(dia.year + 1, 1, 1)
+    return date(dia.year, dia.month + 1, 1)
+
+
+def _nome_particao(inicio):
+    return f"{TABELA}_p{inicio:%Y_%m}"
+
+
+def suportado():
+    return connection.vendor == "postgresql"
+
+
+def tabela_particionada():
+    if not suportado():
+        return False
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table p "
+            "JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = %s",
+            [TABELA],
+        )
+        return cursor.fetchone() is not None
+
+
+def _existe(cursor, nome):
+    cursor.execute("SELECT 1 FROM pg_class WHERE relname = %s", [nome])
+    return cursor.fetchone() is not None
+
+
+def _criar_particao(cursor, inicio):
+    """
+    Cria a partição do mês. Se o mês já tem linhas na partição DEFAULT
+    (o comando deixou de rodar), o PostgreSQL recusa o CREATE ... PARTITION
+    OF: a DEFAULT é desanexada, a partição criada, as linhas movidas e a
+    DEFAULT anexada de novo, tudo na mesma transação.
+    """
+
+    nome = _nome_particao(inicio)
+    fim = _mes_seguinte(inicio)
+
+    if _existe(cursor, nome):
+        return
+
+    criar = (
+        f'CREATE TABLE "{nome}" '
+        f"PARTITION OF \"{TABELA}\" FOR VALUES FROM ('{inicio.isoformat()}') TO ('{fim.isoformat()}')"
+    )
+    no_mes = "data_hora >= %s AND data_hora < %s"
+
+    linhas_na_default = False
+    if _existe(cursor, DEFAULT):
+        cursor.execute(f'SELECT 1 FROM "{DEFAULT}" WHERE {no_mes} LIMIT 1', [inicio, fim])
+        linhas_na_default = cursor.fetchone() is not None
+
+    if not linhas_na_default:
+        cursor.execute(criar)
+        return
+
+    cursor.execute(f'ALTER TABLE "{TABELA}" DETACH PARTITION "{DEFAULT}"')
+    cursor.execute(criar)
+    cursor.execute(f'INSERT INTO "{nome}" SELECT * FROM "{DEFAULT}" WHERE {no_mes}', [inicio, fim])
+    cursor.execute(f'DELETE FROM "{DEFAULT}" WHERE {no_mes}', [inicio, fim])
+    cursor.execute(f'ALTER TABLE "{TABELA}" ATTACH PARTITION "{DEFAULT}" DEFAULT')
+
+
+def garantir_particoes(meses_a_frente=2, desde=None):
+    """
+    Cria as partições do mês atual (ou de `desde`) até `meses_a_frente`.
+    Sem `desde`, começa no mês mais antigo que tiver linhas na partição
+    DEFAULT, para tirar de lá os meses que ficaram sem partição.
+
+    Cada mês roda na sua própria transação: uma falha é registrada no log
+    e não interrompe os demais. Retorna os meses que falharam.
+    """
+
+    hoje = date.today().replace(day=1)
+
+    if desde is None:
+        with connection.cursor() as cursor:
+            if _existe(cursor, DEFAULT):
+                cursor.execute(f'SELECT MIN(data_hora) FROM "{DEFAULT}"')
+                primeiro = cursor.fetchone()[0]
+                if primeiro is not None:
+                    desde = min(primeiro.date(), hoje)
+
+    mes = (desde or hoje).replace(day=1)
+
+    ate = hoje
+    for _ in range(meses_a_frente):
+        ate = _mes_seguinte(ate)
+
+    falhas = []
+
+    while mes <= ate:
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                _criar_particao(cursor, mes)
+        except DatabaseError:
+            logger.exception("Falha ao criar a partição de %s de %s", f"{mes:%m/%Y}", TABELA)
+            falhas.append(mes)
+        mes = _mes_seguinte(mes)
+
+    return falhas
+
+
+def remover_particoes_ate(limite):
+    """
+    Remove (DROP) as partições mensais que terminam até `limite`
+    (inteiras antes dele). Retorna os nomes removidos.
+    """
+
+    limite = limite.date() if hasattr(limite, "date") else limite
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = %s ORDER BY c.relname",
+            [TABELA],
+        )
+        particoes = [nome for (nome,) in cursor.fetchall()]
+
+        removidas = []
+        prefixo = f"{TABELA}_p"
+
+        for nome in particoes:
+            if not nome.startswith(prefixo):
+                continue  # partição DEFAULT
+
+            ano, mes = nome[len(prefixo):].split("_")
+            fim = _mes_seguinte(date(int(ano), int(mes), 1))
+
+            if fim <= limite:
+                cursor.execute(f'DROP TABLE "{nome}"')
+                removidas.append(nome)
+
+    return removidas
+
+
+def particionar():
+    """
+    Converte a tabela de LogAuditoria em particionada por mês de
+    data_hora, copiando os dados. Feito uma vez, numa janela de
+    manutenção: a tabela fica bloqueada durante a cópia.
+
+    A chave primária passa a ser (id, data_hora), exigência do
+    PostgreSQL; o Django continua usando só o id.
+    """
+
+    antiga = f"{TABELA}_antiga"
+
+    with transaction.atomic(), connection.cursor() as cursor:
+
+        cursor.execute(f'LOCK TABLE "{TABELA}" IN ACCESS EXCLUSIVE MODE')
+
+        cursor.execute(
+            "SELECT indexdef FROM pg_indexes "
+            "WHERE tablename = %s AND indexdef NOT LIKE 'CREATE UNIQUE%%'",
+            [TABELA],
+        )
+        indices = [definicao for (definicao,) in cursor.fetchall()]
+
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'f'",
+            [TABELA],
+        )
+        fks = cursor.fetchall()
+
+        cursor.execute(f'SELECT MIN(data_hora) FROM "{TABELA}"')
+        primeiro = cursor.fetchone()[0]
+
+        cursor.execute(f'ALTER TABLE "{TABELA}" RENAME TO "{antiga}"')
+
+        cursor.execute(
+            f'CREATE TABLE "{TABELA}" (LIKE "{antiga}" '
+            f"INCLUDING DEFAULTS INCLUDING IDENTITY INCLUDING CONSTRAINTS) "
+            f"PARTITION BY RANGE (data_hora)"
+        )
+        # nome explícito: o "<tabela>_pkey" ainda pertence à tabela antiga
+        cursor.execute(
+            f'ALTER TABLE "{TABELA}" ADD CONSTRAINT "{TABELA}_id_data_hora_pk" '
+            f"PRIMARY KEY (id, data_hora)"
+        )
+        cursor.execute(f'CREATE TABLE "{TABELA}_default" PARTITION OF "{TABELA}" DEFAULT')
+
+        desde = primeiro.date() if primeiro else None
+        mes = (desde or date.today()).replace(day=1)
+        while mes <= date.today():
+            _criar_particao(cursor, mes)
+            mes = _mes_seguinte(mes)
+        for _ in range(2):
+            _criar_particao(cursor, mes)
+            mes = _mes_seguinte(mes)
+
+        cursor.execute(f'INSERT INTO "{TABELA}" SELECT * FROM "{antiga}"')
+
+        # id serial (não identity): a sequência era da tabela antiga
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [TABELA])
+        if cursor.fetchone()[0] is None:
+            cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [antiga])
+            sequencia = cursor.fetchone()[0]
+            cursor.execute(f'ALTER SEQUENCE {sequencia} OWNED BY "{TABELA}".id')
+
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+            f'COALESCE((SELECT MAX(id) FROM "{TABELA}"), 0) + 1, false)',
+            [TABELA],
+        )
+
+        cursor.execute(f'DROP TABLE "{antiga}"')
+
+        # definições lidas antes do RENAME: já apontam para o nome original
+        for definicao in indices:
+            cursor.execute(definicao)
+
+        for nome, definicao in fks:
+            cursor.execute(f'ALTER TABLE "{TABELA}" ADD CONSTRAINT "{nome}" {definicao}')
@@ -1,15 +1,44 @@
 # auditoria/utils/serializer.py
 
-def model_to_dict(instance):
+from copy import deepcopy
+
+
+def valores_carregados(instance):
+    """
+    Valores já carregados na instância, sem conversão. Lê direto de
+    instance.__dict__: FKs entram pelo id (attname), sem buscar o objeto
+    relacionado, e campos adiados (only/defer) ficam de fora — nenhuma
+    query é disparada. Só dict/list (JSONField) são copiados, porque
+    podem ser alterados no lugar.
+    """
     data = {}
+    valores = instance.__dict__
+
+    for field in instance._meta.concrete_fields:
+
+        if field.attname not in valores:
+            continue
+
+        valor = valores[field.attname]
 
-    for field in instance._meta.fields:
-        field_name = field.name
-        value = getattr(instance, field_name)
+        if isinstance(valor, (dict, list)):
+            valor = deepcopy(valor)
 
-        try:
-            data[field_name] = str(value)
-        except:
-            data[field_name] = None
+        data[field.name] = valor
 
-    return data
\ No newline at end of file
+    return data
+
+
+def como_texto(valor):
+    try:
+        return str(valor)
+    except Exception:
+        return None
+
+
+def model_to_dict(instance):
+    """Valores já carregados na instância, como texto."""
+    return {
+        nome: como_texto(valor)
+        for nome, valor in valores_carregados(instance).items()
+    }
@@ -1,3 +1,158 @@
+# auditoria/views.py
+
+from datetime import datetime, time, timedelta
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core import signing
+from django.http import JsonResponse
 from django.shortcuts import render
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from auditoria.models import LogAuditoria
+
+LIMITE_PADRAO = 50
+LIMITE_MAXIMO = 200
+
+_CURSOR_SALT = "auditoria.logs"
+
+
+class CursorInvalido(ValueError):
+    pass
+
+
+# 🔹 CURSOR (data_hora, id) DO ÚLTIMO LOG DA PÁGINA
+def _codificar_cursor(log):
+    return signing.dumps([log.data_hora.isoformat(), log.id], salt=_CURSOR_SALT)
+
+
+def _decodificar_cursor(cursor):
+    try:
+        data_hora, log_id = signing.loads(cursor, salt=_CURSOR_SALT)
+        data_hora = parse_datetime(data_hora)
+        if data_hora is None:
+            raise ValueError
+        return data_hora, int(log_id)
+    except (signing.BadSignature, TypeError, ValueError):
+        raise CursorInvalido("Cursor inválido.")
+
+
+def _inicio_do_dia(dia):
+    return timezone.make_aware(datetime.combine(dia, time.min), timezone.get_current_timezone())
+
+
+# 🔹 FILTROS (cada combinação cai num dos índices do model)
+def _filtrar(params):
+
+    logs = LogAuditoria.objects.all()
+
+    modelo = params.get("modelo")
+    objeto_id = params.get("objeto_id")
+    usuario = params.get("usuario")
+    acao = params.get("acao")
+    de = parse_date(params.get("de") or "")
+    ate = parse_date(params.get("ate") or "")
+
+    if modelo:
+        logs = logs.filter(modelo=modelo)
+
+    if objeto_id:
+        logs = logs.filter(objeto_id=objeto_id)
+
+    if usuario and usuario.isdigit():
+        logs = logs.filter(usuario_id=int(usuario))
+
+    if acao:
+        logs = logs.filter(acao=acao)
+
+    if de:
+        logs = logs.filter(data_hora__gte=_inicio_do_dia(de))
+
+    if ate:
+        logs = logs.filter(data_hora__lt=_inicio_do_dia(ate + timedelta(days=1)))
+
+    return logs
+
+
+def _pagina(params):
+    """
+    Uma página de logs, do mais recente para o mais antigo, por keyset
+    em (data_hora, id): lê limite + 1 linhas para saber se há próxima
+    página, sem OFFSET e sem COUNT(*).
+    """
+
+    try:
+        limite = max(1, min(int(params.get("limite") or LIMITE_PADRAO), LIMITE_MAXIMO))
+    except ValueError:
+        limite = LIMITE_PADRAO
+
+    logs = _filtrar(params)
+
+    cursor = params.get("cursor")
+    if cursor:
+        data_hora, log_id = _decodificar_cursor(cursor)
+        logs = logs.filter(data_hora__lte=data_hora).exclude(data_hora=data_hora, id__gte=log_id)
+
+    logs = list(
+        logs
+        .select_related("usuario")
+        .order_by("-data_hora", "-id")[:limite + 1]
+    )
+
+    proximo = None
+    if len(logs) > limite:
+        logs = logs[:limite]
+        proximo = _codificar_cursor(logs[-1])
+
+    return logs, proximo
+
+
+# 🔹 TELA
+@staff_member_required
+def logs_auditoria(request):
+
+    filtros = request.GET.copy()
+    filtros.pop("cursor", None)
+
+    try:
+        logs, proximo = _pagina(request.GET)
+    except CursorInvalido:
+        # link antigo/adulterado: volta para a primeira página
+        logs, proximo = _pagina(filtros)
+
+    return render(request, "auditoria/logs.html", {
+        "logs": logs,
+        "proximo": proximo,
+        "filtros": filtros,
+        "querystring": filtros.urlencode(),
+        "acoes": LogAuditoria.ACAO_CHOICES,
+    })
+
+
+# 🔹 API JSON
+@staff_member_required
+def api_logs_auditoria(request):
+
+    try:
+        logs, proximo = _pagina(request.GET)
+    except CursorInvalido as e:
+        return JsonResponse({"erro": str(e)}, status=400)
 
-# Create your views here.
+    return JsonResponse({
+        "logs": [
+            {
+                "id": log.id,
+                "data_hora": log.data_hora.isoformat(),
+                "usuario_id": log.usuario_id,
+                "usuario": log.usuario.username if log.usuario else None,
+                "acao": log.acao,
+                "modelo": log.modelo,
+                "objeto_id": log.objeto_id,
+                "descricao": log.descricao,
+                "ip": log.ip,
+                "alteracoes": log.alteracoes,
+            }
+            for log in logs
+        ],
+        "proximo": proximo,
+    })
@@ -0,0 +1,21 @@
+"""
+Cache padrão compartilhado ou não entre os workers.
+
+Sem CACHES configurado o Django usa o locmem, um cache por processo: com
+gunicorn --workers=3, uma invalidação (incr de contador de versão, delete)
+feita num worker não chega aos outros. Caches que decidem permissão ou
+mostram valores financeiros só podem durar entre requests quando o
+backend é compartilhado (Redis, Memcached, banco, arquivo).
+"""
+
+from django.conf import settings
+
+BACKENDS_POR_PROCESSO = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+def cache_compartilhado(alias="default"):
+    backend = settings.CACHES.get(alias, {}).get("BACKEND", "")
+    return backend not in BACKENDS_POR_PROCESSO
@@ -4,6 +4,11 @@ def get_base_template(request):
     com base no tema da escola do usuário.
     """
 
+    tenant = getattr(request, "tenant", None)
+
+    if tenant is not None and tenant.escola:
+        return tenant.base_template
+
     user = request.user
 
     if hasattr(user, "escola") and user.escola:
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from home.models import Escola
+from financeiro.services.inadimplencia import atualizar_snapshot_inadimplencia
+
+
+class Command(BaseCommand):
+    help = "Recalcula o retrato diário de inadimplência (aging) das escolas"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--escola',
+            type=int,
+            help='ID de uma escola específica (default: todas com financeiro ativo)'
+        )
+
+    def handle(self, *args, **options):
+
+        escolas = Escola.objects.filter(financeiro_ativo=True)
+
+        if options['escola']:
+            escolas = Escola.objects.filter(id=options['escola'])
+
+        for escola in escolas:
+
+            total = atualizar_snapshot_inadimplencia(escola)
+
+            self.stdout.write(f"{escola.nome}: {total} linhas")
+
+        self.stdout.write(self.style.SUCCESS("✅ Inadimplência atualizada."))
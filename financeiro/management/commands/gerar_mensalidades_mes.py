@@ -0,0 +1,180 @@
+import os
+import socket
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from home.models import Aluno, Escola
+from financeiro.models import GeracaoMensalidades
+from financeiro.services.gerar_mensalidades import gerar_mensalidades_do_mes
+
+
+# prazo do bloqueio; renovado a cada lote, então só expira se o nó cair
+BLOQUEIO_MINUTOS = 10
+
+
+def _proximo_mes(hoje):
+    if hoje.month == 12:
+        return 1, hoje.year + 1
+    return hoje.month + 1, hoje.year
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera as mensalidades do próximo mês para todas as escolas com "
+        "financeiro ativo (retomável; seguro para cron em vários nós)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mes', type=int, help='Mês de referência (default: próximo mês)')
+        parser.add_argument('--ano', type=int, help='Ano de referência (default: ano do próximo mês)')
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=500,
+            help='Quantidade de alunos por lote (default: 500)'
+        )
+
+    # -----------------------------------
+    # Bloqueio
+    # -----------------------------------
+
+    def _adquirir(self, execucao):
+        agora = timezone.now()
+
+        return GeracaoMensalidades.objects.filter(
+            Q(bloqueio_ate__isnull=True) | Q(bloqueio_ate__lt=agora) | Q(executor=self.executor),
+            pk=execucao.pk,
+        ).update(
+            executor=self.executor,
+            bloqueio_ate=agora + timedelta(minutes=BLOQUEIO_MINUTOS),
+        )
+
+    def _checkpoint(self, execucao, **campos):
+        """Grava o progresso e renova o bloqueio; falha se outro nó o tomou."""
+
+        atualizados = GeracaoMensalidades.objects.filter(
+            pk=execucao.pk,
+            executor=self.executor,
+        ).update(
+            progresso=execucao.progresso,
+            escolas_concluidas=execucao.escolas_concluidas,
+            criadas=execucao.criadas,
+            bloqueio_ate=timezone.now() + timedelta(minutes=BLOQUEIO_MINUTOS),
+            **campos,
+        )
+
+        if not atualizados:
+            raise CommandError("Bloqueio perdido para outra execução; abortando.")
+
+    def _liberar(self, execucao):
+        GeracaoMensalidades.objects.filter(
+            pk=execucao.pk,
+            executor=self.executor,
+        ).update(executor=None, bloqueio_ate=None)
+
+    # -----------------------------------
+    # Geração
+    # -----------------------------------
+
+    def _gerar_escola(self, execucao, escola, mes, ano, lote):
+
+        chave = str(escola.id)
+        ultimo_id = execucao.progresso.get(chave, 0)
+
+        alunos = Aluno.objects.filter(escola=escola, ativo=True).order_by("id")
+
+        criadas_escola = 0
+
+        while True:
+
+            ids = list(
+                alunos.filter(id__gt=ultimo_id).values_list("id", flat=True)[:lote]
+            )
+
+            if not ids:
+                break
+
+            with transaction.atomic():
+
+                criadas, _ = gerar_mensalidades_do_mes(
+                    escola,
+                    Aluno.objects.filter(id__in=ids),
+                    mes,
+                    ano,
+                )
+
+                ultimo_id = ids[-1]
+                criadas_escola += criadas
+
+                execucao.progresso[chave] = ultimo_id
+                execucao.criadas += criadas
+                self._checkpoint(execucao)
+
+        execucao.escolas_concluidas.append(escola.id)
+        self._checkpoint(execucao)
+
+        return criadas_escola
+
+    def handle(self, *args, **options):
+
+        mes, ano = _proximo_mes(date.today())
+        mes = options['mes'] or mes
+        ano = options['ano'] or ano
+        lote = max(1, options['lote'])
+
+        if not 1 <= mes <= 12:
+            raise CommandError("O mês deve estar entre 1 e 12.")
+
+        self.executor = f"{socket.gethostname()}:{os.getpid()}"[:150]
+
+        # get_or_create já trata a corrida de dois nós criando a mesma linha
+        execucao, _ = GeracaoMensalidades.objects.get_or_create(
+            mes_referencia=mes,
+            ano_referencia=ano,
+        )
+
+        if execucao.concluida_em:
+            self.stdout.write(f"Mensalidades de {mes:02d}/{ano} já geradas em {execucao.concluida_em:%d/%m/%Y %H:%M}.")
+            return
+
+        if not self._adquirir(execucao):
+            self.stdout.write(f"Geração de {mes:02d}/{ano} em andamento em outro nó; nada a fazer.")
+            return
+
+        execucao.refresh_from_db()
+
+        if execucao.progresso or execucao.escolas_concluidas:
+            self.stdout.write(f"Retomando geração de {mes:02d}/{ano} ({execucao.criadas} já criadas).")
+
+        try:
+
+            escolas = (
+                Escola.objects
+                .filter(financeiro_ativo=True)
+                .exclude(id__in=execucao.escolas_concluidas)
+                .order_by("id")
+            )
+
+            for escola in escolas:
+
+                inicio = time.monotonic()
+
+                criadas = self._gerar_escola(execucao, escola, mes, ano, lote)
+
+                self.stdout.write(
+                    f"{escola.nome}: {criadas} mensalidades em {time.monotonic() - inicio:.2f}s"
+                )
+
+            self._checkpoint(execucao, concluida_em=timezone.now())
+
+        finally:
+            self._liberar(execucao)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Mensalidades de {mes:02d}/{ano}: {execucao.criadas} criadas."
+        ))
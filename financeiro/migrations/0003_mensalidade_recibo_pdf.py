@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-19 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financeiro', '0002_alter_mensalidade_options_alter_mensalidade_escola_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mensalidade',
+            name='recibo_pdf',
+            field=models.FileField(blank=True, null=True, upload_to='recibos/'),
+        ),
+    ]
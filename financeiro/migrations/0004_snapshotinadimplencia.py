@@ -0,0 +1,38 @@
+# Generated by Django 5.0.7 on 2026-10-19 11:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financeiro', '0003_mensalidade_recibo_pdf'),
+        ('home', '0062_diariodeclasse_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SnapshotInadimplencia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes_referencia', models.IntegerField()),
+                ('ano_referencia', models.IntegerField()),
+                ('data_base', models.DateField()),
+                ('total_emitido', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_pago', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_vencido', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('faixa_0_30', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('faixa_31_60', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('faixa_61_90', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('faixa_90_mais', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('quantidade_vencidas', models.IntegerField(default=0)),
+                ('escola', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots_inadimplencia', to='home.escola')),
+                ('turma', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='home.turma')),
+            ],
+            options={
+                'ordering': ['-ano_referencia', '-mes_referencia'],
+                'indexes': [models.Index(fields=['escola', 'ano_referencia', 'mes_referencia'], name='snapshot_inad_escola_ref_idx')],
+            },
+        ),
+    ]
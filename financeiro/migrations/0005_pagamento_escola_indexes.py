@@ -0,0 +1,41 @@
+# Generated by Django 5.0.7 on 2026-10-19 12:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def preencher_escola(apps, schema_editor):
+    Pagamento = apps.get_model('financeiro', 'Pagamento')
+    Mensalidade = apps.get_model('financeiro', 'Mensalidade')
+
+    Pagamento.objects.filter(escola__isnull=True).update(
+        escola=Subquery(
+            Mensalidade.objects.filter(id=OuterRef('mensalidade_id')).values('escola_id')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financeiro', '0004_snapshotinadimplencia'),
+        ('home', '0062_diariodeclasse_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pagamento',
+            name='escola',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='pagamentos', to='home.escola'),
+        ),
+        migrations.RunPython(preencher_escola, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='pagamento',
+            index=models.Index(fields=['escola', 'data_pagamento'], name='pagamento_escola_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pagamento',
+            index=models.Index(fields=['referencia_gateway'], name='pagamento_ref_gateway_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.7 on 2026-10-19 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financeiro', '0005_pagamento_escola_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeracaoMensalidades',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes_referencia', models.IntegerField()),
+                ('ano_referencia', models.IntegerField()),
+                ('progresso', models.JSONField(blank=True, default=dict)),
+                ('escolas_concluidas', models.JSONField(blank=True, default=list)),
+                ('criadas', models.IntegerField(default=0)),
+                ('iniciada_em', models.DateTimeField(auto_now_add=True)),
+                ('concluida_em', models.DateTimeField(blank=True, null=True)),
+                ('executor', models.CharField(blank=True, max_length=150, null=True)),
+                ('bloqueio_ate', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'unique_together': {('mes_referencia', 'ano_referencia')},
+            },
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.0.7 on 2026-10-19 16:20
+
+from datetime import datetime, time
+
+from django.db import migrations
+from django.utils import timezone
+
+LOTE = 1000
+
+
+def criar_pagamentos(apps, schema_editor):
+    """
+    Até a 0005 a baixa manual (dar_baixa) não criava Pagamento, então as
+    mensalidades pagas antes disso ficariam fora do fluxo de caixa.
+    Cria o lançamento "manual" para cada mensalidade paga sem pagamento.
+    """
+    Mensalidade = apps.get_model('financeiro', 'Mensalidade')
+    Pagamento = apps.get_model('financeiro', 'Pagamento')
+
+    pagas = (
+        Mensalidade.objects
+        .filter(status='pago', pagamentos__isnull=True)
+        .only('id', 'escola_id', 'valor_final', 'pago_em', 'vencimento')
+        .order_by('id')
+    )
+
+    lote = []
+
+    for m in pagas.iterator(chunk_size=LOTE):
+        # sem pago_em, o vencimento é a melhor data disponível
+        data_pagamento = m.pago_em or timezone.make_aware(
+            datetime.combine(m.vencimento, time.min)
+        )
+
+        lote.append(Pagamento(
+            mensalidade_id=m.id,
+            escola_id=m.escola_id,
+            valor=m.valor_final,
+            data_pagamento=data_pagamento,
+            metodo='manual',
+        ))
+
+        if len(lote) >= LOTE:
+            Pagamento.objects.bulk_create(lote)
+            lote = []
+
+    if lote:
+        Pagamento.objects.bulk_create(lote)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financeiro', '0006_geracaomensalidades'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_pagamentos, migrations.RunPython.noop),
+    ]
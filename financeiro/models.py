@@ -1,9 +1,92 @@
 from django.db import models
+from django.db.models import Case, DecimalField, F, Func, IntegerField, Q, Value, When
+from django.db.models.functions import Round
+from auditoria.querysets import AuditoriaQuerySet
 from home.models import Aluno, Escola
 from datetime import date
-from decimal import Decimal
-
-
+from decimal import Decimal, ROUND_HALF_UP
+
+
+# -----------------------------------
+# Política de encargos por atraso
+# (única; usada no Python e no SQL)
+# -----------------------------------
+
+MULTA_ATRASO = Decimal("0.02")      # multa fixa 2%
+JUROS_DIA = Decimal("0.00033")      # juros diário (~1% ao mês)
+
+
+class DiasEntre(Func):
+    """
+    Dias corridos entre duas datas (inicio - fim), como inteiro.
+    """
+
+    output_field = IntegerField()
+    arg_joiner = " - "
+    template = "(%(expressions)s)"
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler,
+            connection,
+            template="CAST(julianday(%(expressions)s) AS INTEGER)",
+            arg_joiner=") - julianday(",
+            **extra_context,
+        )
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler,
+            connection,
+            function="DATEDIFF",
+            template="%(function)s(%(expressions)s)",
+            arg_joiner=", ",
+            **extra_context,
+        )
+
+
+class MensalidadeQuerySet(AuditoriaQuerySet):
+
+    def com_encargos(self, hoje=None):
+        """
+        Anota dias_atraso, multa_calculada (multa + juros) e
+        valor_corrigido, calculados no banco com a mesma regra de
+        Mensalidade.valor_atualizado(). Assim dá para ordenar, filtrar,
+        paginar e somar pelo valor corrigido.
+        """
+
+        hoje = hoje or date.today()
+        atrasada = Q(status="pendente", vencimento__lt=hoje)
+        dinheiro = DecimalField(max_digits=12, decimal_places=2)
+
+        return self.annotate(
+            dias_atraso=Case(
+                When(
+                    atrasada,
+                    then=DiasEntre(Value(hoje, output_field=models.DateField()), F("vencimento")),
+                ),
+                default=Value(0),
+                output_field=IntegerField(),
+            ),
+        ).annotate(
+            multa_calculada=Case(
+                When(
+                    atrasada,
+                    then=Round(
+                        F("valor_final") * Value(MULTA_ATRASO)
+                        + F("valor_final") * Value(JUROS_DIA) * F("dias_atraso"),
+                        2,
+                    ),
+                ),
+                default=Value(Decimal("0.00")),
+                output_field=dinheiro,
+            ),
+        ).annotate(
+            valor_corrigido=models.ExpressionWrapper(
+                F("valor_final") + F("multa_calculada"),
+                output_field=dinheiro,
+            ),
+        )
 
 
 class Mensalidade(models.Model):
@@ -79,6 +162,15 @@ class Mensalidade(models.Model):
         blank=True
     )
 
+    # PDF do recibo, gerado uma única vez na baixa (um recibo pago não muda)
+    recibo_pdf = models.FileField(
+        upload_to="recibos/",
+        null=True,
+        blank=True
+    )
+
+    objects = MensalidadeQuerySet.as_manager()
+
     # -----------------------------------
     # Métodos auxiliares
     # -----------------------------------
@@ -112,13 +204,10 @@ class Mensalidade(models.Model):
 
         dias_atraso = (hoje - self.vencimento).days
 
-        # multa fixa 2%
-        multa = valor * Decimal("0.02")
-
-        # juros diário (~1% ao mês)
-        juros = valor * Decimal("0.00033") * dias_atraso
+        multa = valor * MULTA_ATRASO
+        juros = valor * JUROS_DIA * dias_atraso
 
-        return (valor + multa + juros).quantize(Decimal("0.01"))
+        return valor + (multa + juros).quantize(Decimal("0.01"), ROUND_HALF_UP)
 
     def __str__(self):
         return f"{self.aluno.nome} - {self.mes_nome()}/{self.ano_referencia}"
@@ -148,6 +237,15 @@ class Pagamento(models.Model):
         related_name="pagamentos"
     )
 
+    # cópia de mensalidade.escola, para o fluxo de caixa filtrar direto
+    escola = models.ForeignKey(
+        Escola,
+        on_delete=models.CASCADE,
+        related_name="pagamentos",
+        null=True,
+        blank=True
+    )
+
     valor = models.DecimalField(max_digits=10, decimal_places=2)
 
     metodo = models.CharField(
@@ -166,4 +264,121 @@ class Pagamento(models.Model):
         max_length=100,
         null=True,
         blank=True
-    )
\ No newline at end of file
+    )
+
+    def save(self, *args, **kwargs):
+
+        if not self.escola_id:
+            self.escola_id = (
+                Mensalidade.objects
+                .filter(id=self.mensalidade_id)
+                .values_list("escola_id", flat=True)
+                .first()
+            )
+
+        super().save(*args, **kwargs)
+
+    # bulk_create da conciliação também vai para a auditoria
+    objects = AuditoriaQuerySet.as_manager()
+
+    class Meta:
+
+        indexes = [
+            models.Index(
+                fields=["escola", "data_pagamento"],
+                name="pagamento_escola_data_idx",
+            ),
+            models.Index(
+                fields=["referencia_gateway"],
+                name="pagamento_ref_gateway_idx",
+            ),
+        ]
+
+
+class SnapshotInadimplencia(models.Model):
+    """
+    Retrato diário do contas a receber por turma e mês de referência:
+    valores vencidos por faixa de atraso (aging) e totais do mês.
+    Recalculado por `atualizar_inadimplencia` com uma query por escola.
+    """
+
+    escola = models.ForeignKey(
+        Escola,
+        on_delete=models.CASCADE,
+        related_name="snapshots_inadimplencia"
+    )
+
+    turma = models.ForeignKey(
+        "home.Turma",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+"
+    )
+
+    mes_referencia = models.IntegerField()
+    ano_referencia = models.IntegerField()
+
+    # data em que o retrato foi calculado (base dos dias de atraso)
+    data_base = models.DateField()
+
+    total_emitido = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_pago = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_vencido = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    faixa_0_30 = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    faixa_31_60 = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    faixa_61_90 = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    faixa_90_mais = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    quantidade_vencidas = models.IntegerField(default=0)
+
+    @property
+    def inadimplencia(self):
+        if not self.total_emitido:
+            return Decimal("0.00")
+        return (self.total_vencido / self.total_emitido * 100).quantize(Decimal("0.01"))
+
+    class Meta:
+
+        indexes = [
+            models.Index(
+                fields=["escola", "ano_referencia", "mes_referencia"],
+                name="snapshot_inad_escola_ref_idx",
+            ),
+        ]
+
+        ordering = ["-ano_referencia", "-mes_referencia"]
+
+
+
+class GeracaoMensalidades(models.Model):
+    """
+    Execução agendada de `gerar_mensalidades_mes` para um mês de
+    referência. Guarda o último aluno processado de cada escola (para
+    retomar após uma falha) e um bloqueio com prazo, para que só um nó
+    gere as mensalidades quando o cron roda em todos.
+    """
+
+    mes_referencia = models.IntegerField()
+    ano_referencia = models.IntegerField()
+
+    # {"<escola_id>": <último aluno_id gerado>}
+    progresso = models.JSONField(default=dict, blank=True)
+    escolas_concluidas = models.JSONField(default=list, blank=True)
+
+    criadas = models.IntegerField(default=0)
+
+    iniciada_em = models.DateTimeField(auto_now_add=True)
+    concluida_em = models.DateTimeField(null=True, blank=True)
+
+    # host:pid da execução que detém o bloqueio, válido até bloqueio_ate
+    executor = models.CharField(max_length=150, null=True, blank=True)
+    bloqueio_ate = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+
+        unique_together = ("mes_referencia", "ano_referencia")
+
+    def __str__(self):
+        return f"Geração {self.mes_referencia:02d}/{self.ano_referencia}"
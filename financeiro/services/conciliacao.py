@@ -0,0 +1,350 @@
+import csv
+import io
+import re
+from collections import defaultdict
+from datetime import datetime, time
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.utils import timezone
+
+from financeiro.models import Mensalidade, Pagamento
+from financeiro.services.kpis import invalidar_kpis
+
+
+# -----------------------------------
+# Leitura do extrato
+# -----------------------------------
+
+# Nomes aceitos para cada coluna do CSV (cabeçalho em minúsculas)
+COLUNAS_CSV = {
+    "data": ("data", "data_pagamento", "date", "dtposted"),
+    "valor": ("valor", "amount", "trnamt"),
+    "identificador": ("id", "identificador", "referencia", "txid", "fitid", "e2eid"),
+    "aluno": ("matricula", "cpf", "aluno"),
+    "vencimento": ("vencimento",),
+    "descricao": ("descricao", "historico", "memo"),
+}
+
+
+def _texto(arquivo):
+    conteudo = arquivo.read()
+
+    if isinstance(conteudo, bytes):
+        try:
+            conteudo = conteudo.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            conteudo = conteudo.decode("latin-1")
+
+    return conteudo
+
+
+def _valor(texto):
+    texto = (texto or "").strip().replace("R$", "").replace(" ", "")
+
+    # 1.234,56 -> 1234.56 ; 1234.56 fica como está
+    if "," in texto:
+        texto = texto.replace(".", "").replace(",", ".")
+
+    try:
+        return Decimal(texto).quantize(Decimal("0.01"))
+    except InvalidOperation:
+        return None
+
+
+def _data(texto):
+    texto = (texto or "").strip()
+
+    # OFX usa AAAAMMDD[HHMMSS[.XXX][fuso]]
+    for formato, tamanho in (("%Y-%m-%d", 10), ("%d/%m/%Y", 10), ("%Y%m%d", 8)):
+        try:
+            return datetime.strptime(texto[:tamanho], formato).date()
+        except ValueError:
+            continue
+
+    return None
+
+
+def _chave_aluno(texto):
+    """CPF só com dígitos; matrícula em maiúsculas."""
+    texto = (texto or "").strip().upper()
+    digitos = re.sub(r"\D", "", texto)
+    return digitos if len(digitos) == 11 else texto
+
+
+def _ler_ofx(texto):
+    linhas = []
+
+    for bloco in re.split(r"<STMTTRN>", texto, flags=re.I)[1:]:
+        bloco = re.split(r"</STMTTRN>", bloco, flags=re.I)[0]
+
+        def tag(nome):
+            achado = re.search(rf"<{nome}>([^<\r\n]*)", bloco, re.I)
+            return achado.group(1).strip() if achado else ""
+
+        linhas.append({
+            "data": _data(tag("DTPOSTED")),
+            "valor": _valor(tag("TRNAMT")),
+            "identificador": tag("FITID"),
+            "aluno": "",
+            "vencimento": None,
+            "descricao": tag("MEMO") or tag("NAME"),
+        })
+
+    return linhas
+
+
+def _ler_csv(texto):
+    try:
+        dialeto = csv.Sniffer().sniff(texto[:4096], delimiters=";,\t")
+    except csv.Error:
+        dialeto = csv.excel
+
+    leitor = csv.DictReader(io.StringIO(texto), dialect=dialeto)
+
+    colunas = {}
+    for campo in leitor.fieldnames or []:
+        nome = campo.strip().lower()
+        for chave, aceitos in COLUNAS_CSV.items():
+            if nome in aceitos and chave not in colunas:
+                colunas[chave] = campo
+
+    linhas = []
+
+    for registro in leitor:
+
+        def coluna(chave):
+            return (registro.get(colunas.get(chave)) or "").strip() if chave in colunas else ""
+
+        linhas.append({
+            "data": _data(coluna("data")),
+            "valor": _valor(coluna("valor")),
+            "identificador": coluna("identificador"),
+            "aluno": coluna("aluno"),
+            "vencimento": _data(coluna("vencimento")),
+            "descricao": coluna("descricao"),
+        })
+
+    return linhas
+
+
+def ler_extrato(arquivo):
+    """
+    Lê um extrato bancário/PIX em CSV ou OFX e devolve uma lista de
+    linhas {data, valor, identificador, aluno, vencimento, descricao}.
+    Lançamentos sem valor positivo (débitos, tarifas) são descartados.
+    """
+
+    texto = _texto(arquivo)
+
+    if "<OFX>" in texto.upper() or "<STMTTRN>" in texto.upper():
+        linhas = _ler_ofx(texto)
+    else:
+        linhas = _ler_csv(texto)
+
+    return [l for l in linhas if l["valor"] is not None and l["valor"] > 0]
+
+
+# -----------------------------------
+# Conciliação
+# -----------------------------------
+
+def _indices(escola):
+    """
+    Índices em memória das mensalidades pendentes da escola, montados
+    a partir de uma única query:
+
+    - gateway_id da mensalidade
+    - referencia_gateway de pagamentos já registrados
+    - (matrícula ou CPF do aluno, valor) -> mensalidades por vencimento
+    """
+
+    por_gateway = {}
+    por_referencia = {}
+    por_aluno_valor = defaultdict(list)
+    mensalidades = {}
+
+    registros = (
+        Mensalidade.objects
+        .filter(escola=escola, status="pendente")
+        .com_encargos()
+        .values(
+            "id",
+            "gateway_id",
+            "valor_final",
+            "valor_corrigido",
+            "vencimento",
+            "aluno__nome",
+            "aluno__matricula",
+            "aluno__cpf",
+            "pagamentos__referencia_gateway",
+        )
+        .order_by("vencimento", "id")
+    )
+
+    for r in registros:
+
+        if r["pagamentos__referencia_gateway"]:
+            por_referencia[r["pagamentos__referencia_gateway"]] = r["id"]
+
+        if r["id"] in mensalidades:
+            continue
+
+        mensalidades[r["id"]] = r
+
+        if r["gateway_id"]:
+            por_gateway[r["gateway_id"]] = r["id"]
+
+        valores = {r["valor_final"], r["valor_corrigido"]}
+
+        for chave_aluno in map(_chave_aluno, (r["aluno__matricula"], r["aluno__cpf"])):
+            if not chave_aluno:
+                continue
+            for valor in valores:
+                por_aluno_valor[(chave_aluno, valor)].append(r["id"])
+
+    return mensalidades, por_gateway, por_referencia, por_aluno_valor
+
+
+def conciliar_extrato(escola, linhas, metodo="pix"):
+    """
+    Casa as linhas do extrato com mensalidades pendentes da escola e dá
+    baixa em todas de uma vez (bulk_update + Pagamento em bulk_create,
+    numa única transação).
+
+    Ordem de casamento: gateway_id, referencia_gateway de pagamento,
+    (aluno, valor, vencimento) e, sem vencimento, a pendência mais antiga
+    do aluno com aquele valor.
+
+    Linhas cujo identificador já tem Pagamento na escola (extrato
+    reimportado ou sobreposto) não são casadas de novo, e nenhuma
+    mensalidade é baixada com valor abaixo do valor_final.
+
+    Retorna (conciliadas, nao_conciliadas); cada item conciliado traz a
+    linha do extrato e a mensalidade correspondente, e cada linha não
+    conciliada traz o "motivo".
+    """
+
+    mensalidades, por_gateway, por_referencia, por_aluno_valor = _indices(escola)
+
+    # 🔒 FITID/txid já lançados: reimportar não paga outra mensalidade
+    ja_conciliados = set(
+        Pagamento.objects.filter(
+            escola=escola,
+            referencia_gateway__in={l["identificador"] for l in linhas if l["identificador"]},
+        ).values_list("referencia_gateway", flat=True)
+    )
+
+    usadas = set()
+    conciliadas = []
+    nao_conciliadas = []
+
+    for linha in linhas:
+
+        mensalidade_id = None
+        identificador = linha["identificador"]
+
+        if identificador and identificador in ja_conciliados:
+            nao_conciliadas.append({**linha, "motivo": "Já conciliado"})
+            continue
+
+        for candidato in (por_gateway.get(identificador), por_referencia.get(identificador)):
+            if identificador and candidato and candidato not in usadas:
+                mensalidade_id = candidato
+                break
+
+        if mensalidade_id is None and linha["aluno"]:
+            candidatos = [
+                c for c in por_aluno_valor.get((_chave_aluno(linha["aluno"]), linha["valor"]), [])
+                if c not in usadas
+            ]
+
+            if linha["vencimento"]:
+                candidatos = [
+                    c for c in candidatos
+                    if mensalidades[c]["vencimento"] == linha["vencimento"]
+                ]
+
+            if candidatos:
+                mensalidade_id = candidatos[0]
+
+        if mensalidade_id is None:
+            nao_conciliadas.append({**linha, "motivo": "Nenhuma mensalidade pendente correspondente"})
+            continue
+
+        if linha["valor"] < mensalidades[mensalidade_id]["valor_final"]:
+            nao_conciliadas.append({**linha, "motivo": "Valor abaixo da mensalidade"})
+            continue
+
+        if identificador:
+            # mesmo identificador repetido no próprio arquivo
+            ja_conciliados.add(identificador)
+
+        usadas.add(mensalidade_id)
+        conciliadas.append({"linha": linha, "mensalidade": mensalidades[mensalidade_id]})
+
+    if not conciliadas:
+        return conciliadas, nao_conciliadas
+
+    agora = timezone.now()
+    tz = timezone.get_current_timezone()
+
+    def pago_em(linha):
+        if linha["data"]:
+            return timezone.make_aware(datetime.combine(linha["data"], time(12, 0)), tz)
+        return agora
+
+    baixas = []
+    pagamentos = []
+
+    for item in conciliadas:
+        linha = item["linha"]
+        data_pagamento = pago_em(linha)
+
+        baixas.append(
+            Mensalidade(
+                id=item["mensalidade"]["id"],
+                status="pago",
+                pago_em=data_pagamento,
+            )
+        )
+        pagamentos.append(
+            Pagamento(
+                mensalidade_id=item["mensalidade"]["id"],
+                escola=escola,
+                valor=linha["valor"],
+                metodo=metodo,
+                data_pagamento=data_pagamento,
+                referencia_gateway=linha["identificador"] or None,
+            )
+        )
+
+    with transaction.atomic():
+
+        # Trava as mensalidades e descarta as que foram pagas por outra
+        # requisição depois da leitura dos índices.
+        ainda_pendentes = set(
+            Mensalidade.objects.select_for_update()
+            .filter(id__in=[b.id for b in baixas], status="pendente")
+            .values_list("id", flat=True)
+        )
+
+        if len(ainda_pendentes) < len(baixas):
+            nao_conciliadas += [
+                {**item["linha"], "motivo": "Mensalidade paga por outra operação"}
+                for item in conciliadas
+                if item["mensalidade"]["id"] not in ainda_pendentes
+            ]
+            conciliadas = [
+                item for item in conciliadas
+                if item["mensalidade"]["id"] in ainda_pendentes
+            ]
+            baixas = [b for b in baixas if b.id in ainda_pendentes]
+            pagamentos = [p for p in pagamentos if p.mensalidade_id in ainda_pendentes]
+
+        Mensalidade.objects.bulk_update(baixas, ["status", "pago_em"], batch_size=500)
+        Pagamento.objects.bulk_create(pagamentos, batch_size=500)
+
+    invalidar_kpis(escola.id)
+
+    return conciliadas, nao_conciliadas
@@ -0,0 +1,141 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.core import signing
+from django.db.models import Count, DecimalField, Sum
+from django.db.models.functions import Coalesce, TruncDate, TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from financeiro.models import Pagamento
+
+
+PERIODOS = {
+    "dia": TruncDay,
+    "semana": TruncWeek,
+    "mes": TruncMonth,
+}
+
+SALDO_LIMITE_PADRAO = 31
+SALDO_LIMITE_MAXIMO = 366
+
+_CURSOR_SALT = "financeiro.fluxo_caixa.saldo"
+
+
+class CursorInvalido(ValueError):
+    pass
+
+
+def _inicio_do_dia(dia):
+    return timezone.make_aware(
+        datetime.combine(dia, time.min),
+        timezone.get_current_timezone(),
+    )
+
+
+def _pagamentos(escola, de=None, ate=None):
+    """
+    Pagamentos da escola com data_pagamento em [de, ate] (datas inclusivas),
+    sempre como intervalo sobre a coluna indexada (escola, data_pagamento),
+    sem funções de data no WHERE.
+    """
+
+    qs = Pagamento.objects.filter(escola=escola)
+
+    if de:
+        qs = qs.filter(data_pagamento__gte=_inicio_do_dia(de))
+
+    if ate:
+        qs = qs.filter(data_pagamento__lt=_inicio_do_dia(ate + timedelta(days=1)))
+
+    return qs
+
+
+def _soma():
+    return Coalesce(Sum("valor"), Decimal("0.00"), output_field=DecimalField())
+
+
+# -----------------------------------
+# Totais por período e método
+# -----------------------------------
+
+def totais_por_periodo(escola, de, ate, periodo="dia"):
+    """
+    Total recebido por (período, método) entre `de` e `ate`, numa única
+    query agrupada. `periodo` é "dia", "semana" ou "mes".
+
+    Retorna uma lista ordenada de {periodo, metodo, total, quantidade}.
+    """
+
+    trunc = PERIODOS[periodo]
+
+    return list(
+        _pagamentos(escola, de, ate)
+        .annotate(periodo=trunc("data_pagamento"))
+        .values("periodo", "metodo")
+        .annotate(total=_soma(), quantidade=Count("id"))
+        .order_by("periodo", "metodo")
+    )
+
+
+# -----------------------------------
+# Saldo acumulado (keyset)
+# -----------------------------------
+
+def codificar_cursor(dia, saldo):
+    return signing.dumps({"d": dia.isoformat(), "s": str(saldo)}, salt=_CURSOR_SALT)
+
+
+def decodificar_cursor(cursor):
+    try:
+        dados = signing.loads(cursor, salt=_CURSOR_SALT)
+        return date.fromisoformat(dados["d"]), Decimal(dados["s"])
+    except (signing.BadSignature, KeyError, TypeError, ValueError, ArithmeticError):
+        raise CursorInvalido("Cursor inválido.")
+
+
+def saldo_diario(escola, de=None, ate=None, cursor=None, limite=SALDO_LIMITE_PADRAO):
+    """
+    Recebimentos por dia com saldo acumulado, paginados por data.
+
+    A página seguinte começa no dia posterior ao último entregue
+    (keyset sobre data_pagamento); o cursor carrega esse dia e o saldo
+    acumulado até ele, então nenhuma página volta a somar o histórico.
+    Só a primeira página soma o que foi recebido antes de `de`.
+
+    Retorna (dias, proximo_cursor); proximo_cursor é None na última página.
+    """
+
+    limite = max(1, min(int(limite), SALDO_LIMITE_MAXIMO))
+
+    if cursor:
+        ultimo_dia, saldo = decodificar_cursor(cursor)
+        de = ultimo_dia + timedelta(days=1)
+    else:
+        saldo = Decimal("0.00")
+        if de:
+            saldo = (
+                Pagamento.objects
+                .filter(escola=escola, data_pagamento__lt=_inicio_do_dia(de))
+                .aggregate(total=_soma())["total"]
+            )
+
+    linhas = list(
+        _pagamentos(escola, de, ate)
+        .annotate(dia=TruncDate("data_pagamento"))
+        .values("dia")
+        .annotate(total=_soma(), quantidade=Count("id"))
+        .order_by("dia")[:limite + 1]
+    )
+
+    tem_mais = len(linhas) > limite
+    linhas = linhas[:limite]
+
+    for linha in linhas:
+        saldo += linha["total"]
+        linha["saldo"] = saldo
+
+    proximo = None
+    if tem_mais and linhas:
+        proximo = codificar_cursor(linhas[-1]["dia"], saldo)
+
+    return linhas, proximo
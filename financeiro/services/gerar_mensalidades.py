@@ -1,4 +1,11 @@
+import calendar
+from datetime import date
+from decimal import Decimal
+
+from django.db.models import OuterRef, Subquery
+
 from financeiro.models import Mensalidade
+from financeiro.services.kpis import invalidar_kpis
 
 
 def gerar_mensalidade(aluno, valor, vencimento, mes, ano):
@@ -17,4 +24,143 @@ def gerar_mensalidade(aluno, valor, vencimento, mes, ano):
         desconto=desconto,
         valor_final=valor_final,
         vencimento=vencimento
-    )
\ No newline at end of file
+    )
+
+
+def gerar_mensalidades_em_lote(escola, alunos, meses, ano, valor, dia_vencimento):
+    """
+    Gera as mensalidades de `alunos` para os `meses` do `ano` informados.
+
+    As chaves (aluno, mês) já existentes são lidas numa única query e as
+    novas mensalidades são inseridas com um só bulk_create, respeitando o
+    unique_together (aluno, mes_referencia, ano_referencia).
+
+    Retorna (criadas, ignoradas).
+    """
+
+    meses = list(meses)
+    alunos = list(alunos.only("id", "dia_vencimento", "desconto_mensal"))
+
+    existentes = set(
+        Mensalidade.objects.filter(
+            aluno__in=alunos,
+            ano_referencia=ano,
+            mes_referencia__in=meses,
+        ).values_list("aluno_id", "mes_referencia")
+    )
+
+    valor_original = Decimal(valor)
+    novas = []
+
+    for mes in meses:
+
+        ultimo_dia = calendar.monthrange(ano, mes)[1]
+
+        for aluno in alunos:
+
+            if (aluno.id, mes) in existentes:
+                continue
+
+            dia_aluno = aluno.dia_vencimento or dia_vencimento
+            vencimento = date(ano, mes, min(dia_aluno, ultimo_dia))
+
+            desconto_auto = Decimal(aluno.desconto_mensal or 0)
+
+            valor_final = max(valor_original - desconto_auto, Decimal("0.00"))
+
+            novas.append(
+                Mensalidade(
+                    escola=escola,
+                    aluno=aluno,
+                    mes_referencia=mes,
+                    ano_referencia=ano,
+                    valor_original=valor_original,
+                    desconto=desconto_auto,
+                    valor_final=valor_final,
+                    vencimento=vencimento,
+                    status="pendente",
+                )
+            )
+
+    Mensalidade.objects.bulk_create(
+        novas,
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+
+    if novas:
+        invalidar_kpis(escola.id)
+
+    return len(novas), len(meses) * len(alunos) - len(novas)
+
+
+def gerar_mensalidades_do_mes(escola, alunos, mes, ano):
+    """
+    Gera a mensalidade de mes/ano para `alunos` repetindo o valor
+    original e o dia de vencimento da última mensalidade de cada um
+    (lidos por subquery na mesma query dos alunos). Alunos que nunca
+    tiveram mensalidade ficam de fora: a primeira cobrança continua
+    sendo lançada pela tela de geração.
+
+    Retorna (criadas, ignoradas).
+    """
+
+    ultima = (
+        Mensalidade.objects
+        .filter(aluno=OuterRef("pk"))
+        .order_by("-ano_referencia", "-mes_referencia")
+    )
+
+    alunos = list(
+        alunos
+        .only("id", "dia_vencimento", "desconto_mensal")
+        .annotate(
+            ultimo_valor=Subquery(ultima.values("valor_original")[:1]),
+            ultimo_vencimento=Subquery(ultima.values("vencimento")[:1]),
+        )
+        .filter(ultimo_valor__isnull=False)
+    )
+
+    existentes = set(
+        Mensalidade.objects.filter(
+            aluno__in=alunos,
+            ano_referencia=ano,
+            mes_referencia=mes,
+        ).values_list("aluno_id", flat=True)
+    )
+
+    ultimo_dia = calendar.monthrange(ano, mes)[1]
+    novas = []
+
+    for aluno in alunos:
+
+        if aluno.id in existentes:
+            continue
+
+        dia_aluno = aluno.dia_vencimento or aluno.ultimo_vencimento.day
+        desconto_auto = Decimal(aluno.desconto_mensal or 0)
+
+        novas.append(
+            Mensalidade(
+                escola=escola,
+                aluno=aluno,
+                mes_referencia=mes,
+                ano_referencia=ano,
+                valor_original=aluno.ultimo_valor,
+                desconto=desconto_auto,
+                valor_final=max(aluno.ultimo_valor - desconto_auto, Decimal("0.00")),
+                vencimento=date(ano, mes, min(dia_aluno, ultimo_dia)),
+                status="pendente",
+            )
+        )
+
+    Mensalidade.objects.bulk_create(
+        novas,
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+
+    if novas:
+        invalidar_kpis(escola.id)
+
+    return len(novas), len(alunos) - len(novas)
@@ -0,0 +1,76 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, Q, Sum
+from django.db.models.functions import Coalesce
+
+from financeiro.models import Mensalidade, SnapshotInadimplencia
+
+
+FAIXAS_ATRASO = (
+    ("faixa_0_30", 0, 30),
+    ("faixa_31_60", 31, 60),
+    ("faixa_61_90", 61, 90),
+    ("faixa_90_mais", 91, None),
+)
+
+
+def _soma(filtro=None):
+    return Coalesce(
+        Sum("valor_final", filter=filtro),
+        Decimal("0.00"),
+        output_field=DecimalField(),
+    )
+
+
+def atualizar_snapshot_inadimplencia(escola, hoje=None):
+    """
+    Recalcula o retrato de inadimplência da escola: uma única query
+    agregada por (turma principal do aluno, mês/ano de referência), com
+    os valores vencidos separados por faixa de atraso.
+
+    O retrato anterior da escola é substituído na mesma transação.
+    Retorna a quantidade de linhas gravadas.
+    """
+
+    hoje = hoje or date.today()
+
+    vencida = Q(status="pendente", vencimento__lt=hoje)
+
+    faixas = {}
+    for campo, de, ate in FAIXAS_ATRASO:
+        filtro = vencida & Q(vencimento__lte=hoje - timedelta(days=max(de, 1)))
+        if ate is not None:
+            filtro &= Q(vencimento__gte=hoje - timedelta(days=ate))
+        faixas[campo] = _soma(filtro)
+
+    linhas = (
+        Mensalidade.objects
+        .filter(escola=escola)
+        .values("aluno__turma_principal", "ano_referencia", "mes_referencia")
+        .annotate(
+            total_emitido=_soma(),
+            total_pago=_soma(Q(status="pago")),
+            total_vencido=_soma(vencida),
+            quantidade_vencidas=Count("id", filter=vencida),
+            **faixas,
+        )
+        .order_by()
+    )
+
+    snapshots = [
+        SnapshotInadimplencia(
+            escola=escola,
+            turma_id=linha.pop("aluno__turma_principal"),
+            data_base=hoje,
+            **linha,
+        )
+        for linha in linhas
+    ]
+
+    with transaction.atomic():
+        SnapshotInadimplencia.objects.filter(escola=escola).delete()
+        SnapshotInadimplencia.objects.bulk_create(snapshots, batch_size=500)
+
+    return len(snapshots)
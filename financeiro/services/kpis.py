@@ -0,0 +1,102 @@
+from calendar import monthrange
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, DecimalField, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from financeiro.models import Mensalidade
+
+
+# curto sem cache compartilhado: ver KPIS_CACHE_TIMEOUT em settings
+KPIS_CACHE_TIMEOUT = getattr(settings, "KPIS_CACHE_TIMEOUT", 30)
+
+
+def _versao_key(escola_id):
+    return f"financeiro:kpis:versao:{escola_id}"
+
+
+def invalidar_kpis(escola_id):
+    """
+    Descarta os KPIs em cache da escola (todos os meses), trocando a
+    versão usada na chave. Chamado sempre que uma mensalidade muda.
+    """
+    try:
+        cache.incr(_versao_key(escola_id))
+    except ValueError:
+        cache.set(_versao_key(escola_id), 1, None)
+
+
+def _intervalo_mes(mes, ano):
+    """Início e fim (exclusivo) do mês no fuso atual, para filtrar pago_em."""
+    tz = timezone.get_current_timezone()
+    inicio = datetime.combine(date(ano, mes, 1), time.min)
+    fim = inicio + timedelta(days=monthrange(ano, mes)[1])
+    return timezone.make_aware(inicio, tz), timezone.make_aware(fim, tz)
+
+
+def _soma(filtro):
+    return Coalesce(
+        Sum("valor_final", filter=filtro),
+        Decimal("0.00"),
+        output_field=DecimalField(),
+    )
+
+
+def calcular_kpis(escola, mes, ano):
+    """
+    KPIs do painel financeiro do mês (mes/ano de referência), numa única
+    query de agregação condicional:
+
+    - total_pago, total_pendente, total_vencido, total_mes
+      e quantidade_vencidas: mensalidades de referência mes/ano
+    - receita_mes: valor recebido com pago_em dentro do mês
+    - total_a_receber: todas as pendentes da escola, com multa e juros
+      (Mensalidade.objects.com_encargos)
+    """
+
+    hoje = date.today()
+    inicio, fim = _intervalo_mes(mes, ano)
+
+    do_mes = Q(mes_referencia=mes, ano_referencia=ano)
+    recebido_no_mes = Q(status="pago", pago_em__gte=inicio, pago_em__lt=fim)
+    vencido = do_mes & Q(status="pendente", vencimento__lt=hoje)
+
+    pendente = Q(status="pendente")
+
+    return Mensalidade.objects.filter(
+        Q(escola=escola) & (do_mes | recebido_no_mes | pendente)
+    ).com_encargos(hoje).aggregate(
+        total_pago=_soma(do_mes & Q(status="pago")),
+        total_pendente=_soma(do_mes & Q(status="pendente", vencimento__gte=hoje)),
+        total_vencido=_soma(vencido),
+        total_mes=_soma(do_mes),
+        receita_mes=_soma(recebido_no_mes),
+        quantidade_vencidas=Count("id", filter=vencido),
+        total_a_receber=Coalesce(
+            Sum("valor_corrigido", filter=pendente),
+            Decimal("0.00"),
+            output_field=DecimalField(),
+        ),
+    )
+
+
+def get_kpis(escola, mes, ano):
+    """
+    KPIs do mês com cache por (escola, mes, ano). A data de hoje entra na
+    chave porque pendente/vencido muda na virada do dia.
+    """
+
+    versao = cache.get(_versao_key(escola.id), 0)
+    key = f"financeiro:kpis:{escola.id}:{versao}:{ano}:{mes}:{date.today():%Y%m%d}"
+
+    kpis = cache.get(key)
+
+    if kpis is None:
+        kpis = calcular_kpis(escola, mes, ano)
+        cache.set(key, kpis, KPIS_CACHE_TIMEOUT)
+
+    return kpis
@@ -1,7 +1,10 @@
 from django.urls import path
 from financeiro.views.gerar_recibo import(
-    gerar_recibo
+    gerar_recibo,
+    recibos_em_lote,
 )
+from financeiro.views.views_fluxo_caixa import fluxo_caixa, api_saldo_caixa
+from financeiro.views.views_inadimplencia import inadimplencia
 from financeiro.views.views_mensalidades import (
     listar_mensalidades,
     gerar_mensalidades,
@@ -10,6 +13,7 @@ from financeiro.views.views_mensalidades import (
     exportar_excel,
     estornar_mensalidade,
     atualizar_desconto,
+    conciliar_extrato_view,
 )
 
 urlpatterns = [
@@ -33,6 +37,7 @@ urlpatterns = [
     ),
 
     path('financeiro/recibo/<int:mensalidade_id>/', gerar_recibo, name='gerar_recibo'),
+    path('financeiro/recibos/', recibos_em_lote, name='recibos_em_lote'),
 
        path('mensalidades/exportar/csv/',
          exportar_csv,
@@ -43,6 +48,30 @@ urlpatterns = [
          name='exportar_excel'),
 
     path('mensalidades/<int:id>/estornar/', estornar_mensalidade),
-    path("mensalidades/<int:id>/desconto/", atualizar_desconto, name="atualizar_desconto")
+    path("mensalidades/<int:id>/desconto/", atualizar_desconto, name="atualizar_desconto"),
+
+    path(
+        "inadimplencia/",
+        inadimplencia,
+        name="inadimplencia"
+    ),
+
+    path(
+        "mensalidades/conciliar/",
+        conciliar_extrato_view,
+        name="conciliar_extrato"
+    ),
+
+    path(
+        "fluxo-caixa/",
+        fluxo_caixa,
+        name="fluxo_caixa"
+    ),
+
+    path(
+        "fluxo-caixa/saldo/",
+        api_saldo_caixa,
+        name="api_saldo_caixa"
+    ),
 
 ]
\ No newline at end of file
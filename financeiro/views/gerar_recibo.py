@@ -1,6 +1,12 @@
-from django.http import HttpResponse
+from io import BytesIO
+import logging
+
+from django.core.files.base import ContentFile
+from django.http import FileResponse, HttpResponse
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import get_object_or_404
 from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+    SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
 )
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -9,23 +15,12 @@ from reportlab.lib.units import cm
 from financeiro.models import Mensalidade
 from django.utils.timezone import localtime
 from auditoria.utils.logs import registrar_log
+from home.utils import pdf_arquivo_temporario, pdf_streaming_response
 
+logger = logging.getLogger(__name__)
 
-def gerar_recibo(request, mensalidade_id):
-
-    mensalidade = Mensalidade.objects.select_related('aluno').get(id=mensalidade_id)
 
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'inline; filename="recibo_{mensalidade.id}.pdf"'
-
-    doc = SimpleDocTemplate(
-        response,
-        pagesize=A4,
-        rightMargin=2*cm,
-        leftMargin=2*cm,
-        topMargin=2*cm,
-        bottomMargin=2*cm
-    )
+def _estilos():
 
     styles = getSampleStyleSheet()
 
@@ -33,33 +28,40 @@ def gerar_recibo(request, mensalidade_id):
     # ESTILOS CUSTOM
     # =========================
 
-    title_style = ParagraphStyle(
-        'Titulo',
-        parent=styles['Title'],
-        alignment=1
+    return {
+        "titulo": ParagraphStyle(
+            'Titulo',
+            parent=styles['Title'],
+            alignment=1
+        ),
+        "secao": ParagraphStyle(
+            'Secao',
+            parent=styles['Heading3'],
+            spaceAfter=10
+        ),
+        "normal": styles['Normal'],
+    }
+
+
+def _novo_documento(destino):
+    return SimpleDocTemplate(
+        destino,
+        pagesize=A4,
+        rightMargin=2*cm,
+        leftMargin=2*cm,
+        topMargin=2*cm,
+        bottomMargin=2*cm
     )
 
-    section_style = ParagraphStyle(
-        'Secao',
-        parent=styles['Heading3'],
-        spaceAfter=10
-    )
 
-    normal_style = styles['Normal']
+def _elementos_recibo(mensalidade, escola, estilos):
 
-    destaque_style = ParagraphStyle(
-        'Destaque',
-        parent=styles['Normal'],
-        fontSize=14,
-        textColor=colors.green,
-        spaceAfter=10
-    )
+    title_style = estilos["titulo"]
+    section_style = estilos["secao"]
+    normal_style = estilos["normal"]
 
     elements = []
 
-    escola = request.escola
-
-
     # =========================
     # FORMATAÇÕES
     # =========================
@@ -178,10 +180,131 @@ def gerar_recibo(request, mensalidade_id):
     elements.append(Paragraph("__________________________________", normal_style))
     elements.append(Paragraph("Assinatura / Carimbo", normal_style))
 
-    # =========================
-    # BUILD
-    # =========================
+    return elements
+
+
+def montar_recibos_pdf(mensalidades, escola, destino):
+    """
+    Monta um PDF com o recibo de cada mensalidade (um por página)
+    e grava em `destino`.
+    """
+
+    estilos = _estilos()
+    elements = []
+
+    for i, mensalidade in enumerate(mensalidades):
+        if i:
+            elements.append(PageBreak())
+        elements += _elementos_recibo(mensalidade, escola, estilos)
+
+    _novo_documento(destino).build(elements)
+
 
-    doc.build(elements)
+def salvar_recibo(mensalidade):
+    """
+    Gera e guarda o PDF do recibo de uma mensalidade paga. Depois disso o
+    recibo é servido direto do storage, sem ser montado de novo.
+    """
 
-    return response
\ No newline at end of file
+    if mensalidade.status != "pago":
+        return
+
+    buffer = BytesIO()
+    montar_recibos_pdf([mensalidade], mensalidade.escola, buffer)
+
+    mensalidade.recibo_pdf.save(
+        f"recibo_{mensalidade.id}.pdf",
+        ContentFile(buffer.getvalue()),
+        save=False
+    )
+    Mensalidade.objects.filter(id=mensalidade.id).update(
+        recibo_pdf=mensalidade.recibo_pdf.name
+    )
+
+
+def descartar_recibo(mensalidade):
+    """Remove o recibo guardado (ex.: estorno do pagamento)."""
+
+    if mensalidade.recibo_pdf:
+        mensalidade.recibo_pdf.delete(save=False)
+        Mensalidade.objects.filter(id=mensalidade.id).update(recibo_pdf=None)
+
+
+@login_required
+def gerar_recibo(request, mensalidade_id):
+
+    mensalidade = get_object_or_404(
+        Mensalidade.objects.select_related('aluno'),
+        id=mensalidade_id,
+        escola=request.escola
+    )
+
+    filename = f"recibo_{mensalidade.id}.pdf"
+
+    # Recibo já guardado na baixa: serve do storage
+    if mensalidade.status == "pago" and mensalidade.recibo_pdf:
+        try:
+            return FileResponse(
+                mensalidade.recibo_pdf.open("rb"),
+                filename=filename,
+                content_type='application/pdf'
+            )
+        except FileNotFoundError:
+            logger.warning("Recibo %s não encontrado no storage", filename)
+
+    # Pagas antes do cache existir: gera e guarda agora
+    if mensalidade.status == "pago":
+        salvar_recibo(mensalidade)
+        return FileResponse(
+            mensalidade.recibo_pdf.open("rb"),
+            filename=filename,
+            content_type='application/pdf'
+        )
+
+    response = HttpResponse(content_type='application/pdf')
+    response['Content-Disposition'] = f'inline; filename="{filename}"'
+
+    montar_recibos_pdf([mensalidade], request.escola, response)
+
+    return response
+
+
+@login_required
+def recibos_em_lote(request):
+    """
+    Carnê com todos os recibos pagos do mês (mes/ano de referência)
+    e/ou de uma turma, num único PDF.
+    """
+
+    escola = request.escola
+
+    mes = request.GET.get("mes")
+    ano = request.GET.get("ano")
+    turma_id = request.GET.get("turma")
+
+    mensalidades = Mensalidade.objects.filter(
+        escola=escola,
+        status="pago"
+    ).select_related(
+        'aluno',
+        'aluno__turma_principal'
+    ).order_by('aluno__nome', 'ano_referencia', 'mes_referencia')
+
+    if mes:
+        mensalidades = mensalidades.filter(mes_referencia=int(mes))
+
+    if ano:
+        mensalidades = mensalidades.filter(ano_referencia=int(ano))
+
+    if turma_id:
+        mensalidades = mensalidades.filter(aluno__turmas=turma_id)
+
+    arquivo = pdf_arquivo_temporario()
+    montar_recibos_pdf(mensalidades, escola, arquivo)
+
+    partes = [p for p in (mes and f"{int(mes):02d}", ano, turma_id and f"turma_{turma_id}") if p]
+
+    return pdf_streaming_response(
+        arquivo,
+        f"recibos_{'_'.join(partes) or 'todos'}.pdf"
+    )
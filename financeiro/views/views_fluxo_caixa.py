@@ -0,0 +1,126 @@
+from collections import OrderedDict
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.shortcuts import render
+from django.utils.dateparse import parse_date
+
+from financeiro.models import Pagamento
+from financeiro.services.fluxo_caixa import (
+    PERIODOS,
+    SALDO_LIMITE_PADRAO,
+    CursorInvalido,
+    saldo_diario,
+    totais_por_periodo,
+)
+
+
+METODOS = Pagamento._meta.get_field("metodo").choices
+
+
+def _intervalo(request):
+    """?de / ?ate (AAAA-MM-DD); padrão é o mês corrente até hoje."""
+
+    hoje = date.today()
+
+    de = parse_date(request.GET.get("de") or "") or hoje.replace(day=1)
+    ate = parse_date(request.GET.get("ate") or "") or hoje
+
+    return de, ate
+
+
+# =========================
+# FLUXO DE CAIXA
+# =========================
+
+@login_required
+def fluxo_caixa(request):
+    """
+    Recebimentos da escola por dia, semana ou mês (?periodo=dia|semana|mes),
+    com uma coluna por método de pagamento.
+    """
+
+    escola = request.escola
+    de, ate = _intervalo(request)
+
+    periodo = request.GET.get("periodo")
+    if periodo not in PERIODOS:
+        periodo = "dia"
+
+    linhas = OrderedDict()
+    totais_metodo = {valor: Decimal("0.00") for valor, _ in METODOS}
+
+    for r in totais_por_periodo(escola, de, ate, periodo):
+
+        linha = linhas.setdefault(r["periodo"], {
+            "periodo": r["periodo"],
+            "metodos": {valor: Decimal("0.00") for valor, _ in METODOS},
+            "total": Decimal("0.00"),
+            "quantidade": 0,
+        })
+
+        linha["metodos"][r["metodo"]] = r["total"]
+        linha["total"] += r["total"]
+        linha["quantidade"] += r["quantidade"]
+
+        totais_metodo[r["metodo"]] = totais_metodo.get(r["metodo"], Decimal("0.00")) + r["total"]
+
+    linhas = list(linhas.values())
+
+    for linha in linhas:
+        linha["colunas"] = [linha["metodos"][valor] for valor, _ in METODOS]
+
+    return render(
+        request,
+        "financeiro/fluxo_caixa.html",
+        {
+            "linhas": linhas,
+            "metodos": METODOS,
+            "totais_metodo": [(rotulo, totais_metodo[valor]) for valor, rotulo in METODOS],
+            "total_geral": sum((l["total"] for l in linhas), Decimal("0.00")),
+            "de": de,
+            "ate": ate,
+            "periodo": periodo,
+        }
+    )
+
+
+@login_required
+def api_saldo_caixa(request):
+    """
+    Saldo acumulado dia a dia em JSON, paginado por data:
+    ?de, ?ate, ?limite e ?cursor (o "proximo" da página anterior).
+    """
+
+    de, ate = _intervalo(request)
+
+    try:
+        limite = int(request.GET.get("limite") or SALDO_LIMITE_PADRAO)
+    except ValueError:
+        return JsonResponse({"error": "limite inválido"}, status=400)
+
+    try:
+        dias, proximo = saldo_diario(
+            request.escola,
+            de=de,
+            ate=ate,
+            cursor=request.GET.get("cursor"),
+            limite=limite,
+        )
+    except CursorInvalido as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse({
+        "dias": [
+            {
+                "data": d["dia"].isoformat(),
+                "total": str(d["total"]),
+                "quantidade": d["quantidade"],
+                "saldo": str(d["saldo"]),
+            }
+            for d in dias
+        ],
+        "proximo": proximo,
+    })
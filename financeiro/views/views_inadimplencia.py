@@ -0,0 +1,109 @@
+import csv
+from decimal import Decimal
+
+from django.contrib.auth.decorators import login_required
+from django.db.models import Sum
+from django.http import HttpResponse
+from django.shortcuts import render
+
+from financeiro.models import SnapshotInadimplencia
+from financeiro.services.inadimplencia import atualizar_snapshot_inadimplencia
+from home.models import Turma
+
+
+CAMPOS_VALOR = (
+    "total_emitido",
+    "total_pago",
+    "total_vencido",
+    "faixa_0_30",
+    "faixa_31_60",
+    "faixa_61_90",
+    "faixa_90_mais",
+    "quantidade_vencidas",
+)
+
+
+# =========================
+# INADIMPLÊNCIA (AGING)
+# =========================
+
+@login_required
+def inadimplencia(request):
+    """
+    Painel de inadimplência por mês de referência (todos os anos), lido
+    do retrato diário SnapshotInadimplencia. ?turma=<id> filtra a turma
+    e ?formato=csv exporta a mesma tabela.
+    """
+
+    escola = request.escola
+    turma_id = request.GET.get("turma")
+
+    snapshots = SnapshotInadimplencia.objects.filter(escola=escola)
+
+    # Primeiro acesso antes do comando agendado rodar
+    if not snapshots.exists():
+        atualizar_snapshot_inadimplencia(escola)
+
+    if turma_id:
+        snapshots = snapshots.filter(turma_id=turma_id)
+
+    meses = list(
+        snapshots
+        .values("ano_referencia", "mes_referencia")
+        .annotate(**{campo: Sum(campo) for campo in CAMPOS_VALOR})
+        .order_by("-ano_referencia", "-mes_referencia")
+    )
+
+    for m in meses:
+        emitido = m["total_emitido"] or Decimal("0.00")
+        m["inadimplencia"] = (
+            (m["total_vencido"] / emitido * 100).quantize(Decimal("0.01"))
+            if emitido else Decimal("0.00")
+        )
+
+    data_base = (
+        snapshots.values_list("data_base", flat=True).first()
+    )
+
+    if request.GET.get("formato") == "csv":
+
+        response = HttpResponse(content_type="text/csv")
+        response["Content-Disposition"] = "attachment; filename=inadimplencia.csv"
+
+        writer = csv.writer(response)
+        writer.writerow([
+            "Ano", "Mês", "Emitido", "Pago", "Vencido",
+            "0-30 dias", "31-60 dias", "61-90 dias", "90+ dias",
+            "Qtd. vencidas", "Inadimplência (%)",
+        ])
+
+        for m in meses:
+            writer.writerow([
+                m["ano_referencia"],
+                m["mes_referencia"],
+                m["total_emitido"],
+                m["total_pago"],
+                m["total_vencido"],
+                m["faixa_0_30"],
+                m["faixa_31_60"],
+                m["faixa_61_90"],
+                m["faixa_90_mais"],
+                m["quantidade_vencidas"],
+                m["inadimplencia"],
+            ])
+
+        return response
+
+    totais = snapshots.aggregate(**{campo: Sum(campo) for campo in CAMPOS_VALOR})
+
+    return render(
+        request,
+        "financeiro/inadimplencia.html",
+        {
+            "meses": meses,
+            "totais": totais,
+            "data_base": data_base,
+            "turmas": Turma.objects.filter(escola=escola).order_by("nome"),
+            "turma_selecionada": turma_id or "",
+        }
+    )
@@ -1,23 +1,39 @@
 from django.shortcuts import render, redirect
-from financeiro.models import Mensalidade
-from django.http import JsonResponse, HttpResponse
+from financeiro.models import Mensalidade, Pagamento
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse, FileResponse
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from home.models import Aluno, Turma
 from django.contrib import messages
 from datetime import date
 from decimal import Decimal
-import calendar
 import csv
+import tempfile
 from django.views.decorators.http import require_POST
 from django.contrib.auth.decorators import login_required
 
 from django.db.models import Sum, DecimalField
 from django.db.models.functions import Coalesce
 from django.core.paginator import Paginator
-from openpyxl import Workbook
 import json
+import logging
 from auditoria.utils.logs import registrar_log
+from financeiro.services.gerar_mensalidades import gerar_mensalidades_em_lote
+from financeiro.services.conciliacao import conciliar_extrato, ler_extrato
+from financeiro.services.kpis import get_kpis, invalidar_kpis
+from financeiro.views.gerar_recibo import salvar_recibo, descartar_recibo
 
+logger = logging.getLogger(__name__)
+
+
+
+ORDENACOES_MENSALIDADES = (
+    "vencimento",
+    "aluno__nome",
+    "valor_final",
+    "valor_corrigido",
+    "dias_atraso",
+)
 
 
 def listar_mensalidades(request):
@@ -59,44 +75,28 @@ def listar_mensalidades(request):
     mensalidades_mes = mensalidades.filter(
         mes_referencia=mes,
         ano_referencia=ano
-    )
+    ).com_encargos(hoje)
+
+    # =========================
+    # ORDENAÇÃO (inclui valor corrigido, calculado no banco)
+    # =========================
+
+    ordenar = request.GET.get("ordenar", "")
+
+    if ordenar.lstrip("-") in ORDENACOES_MENSALIDADES:
+        mensalidades_mes = mensalidades_mes.order_by(ordenar, "id")
 
     # =========================
-    # CÁLCULOS
+    # CÁLCULOS (uma query, em cache)
     # =========================
 
-    total_pago = mensalidades_mes.filter(
-        status="pago"
-    ).aggregate(
-        total=Coalesce(Sum("valor_final"), Decimal("0.00"), output_field=DecimalField())
-    )["total"]
-
-    total_pendente = mensalidades_mes.filter(
-        status="pendente",
-        vencimento__gte=hoje
-    ).aggregate(
-        total=Coalesce(Sum("valor_final"), Decimal("0.00"), output_field=DecimalField())
-    )["total"]
-
-    total_vencido = mensalidades_mes.filter(
-        status="pendente",
-        vencimento__lt=hoje
-    ).aggregate(
-        total=Coalesce(Sum("valor_final"), Decimal("0.00"), output_field=DecimalField())
-    )["total"]
-
-    receita_mes = Mensalidade.objects.filter(
-        escola=escola,
-        status="pago",
-        pago_em__month=mes,
-        pago_em__year=ano
-    ).aggregate(
-        total=Coalesce(Sum("valor_final"), Decimal("0.00"), output_field=DecimalField())
-    )["total"]
-
-    total_mes = mensalidades_mes.aggregate(
-        total=Coalesce(Sum("valor_final"), Decimal("0.00"), output_field=DecimalField())
-    )["total"]
+    kpis = get_kpis(escola, mes, ano)
+
+    total_pago = kpis["total_pago"]
+    total_pendente = kpis["total_pendente"]
+    total_vencido = kpis["total_vencido"]
+    receita_mes = kpis["receita_mes"]
+    total_mes = kpis["total_mes"]
 
     inadimplencia = 0
     if total_mes > 0:
@@ -104,10 +104,8 @@ def listar_mensalidades(request):
 
     previsao_receita = total_pendente + total_vencido
 
-    quantidade_vencidas = mensalidades_mes.filter(
-        status="pendente",
-        vencimento__lt=hoje
-    ).count()
+    quantidade_vencidas = kpis["quantidade_vencidas"]
+    total_a_receber = kpis["total_a_receber"]
 
     # =========================
     # PAGINAÇÃO
@@ -117,24 +115,6 @@ def listar_mensalidades(request):
     page = request.GET.get('page')
     mensalidades_paginadas = paginator.get_page(page)
 
-    # =========================
-    # MULTA
-    # =========================
-
-    for m in mensalidades_paginadas:
-
-        valor_original = m.valor_final
-        multa = Decimal("0.00")
-        dias_atraso = 0
-
-        if m.status == "pendente" and m.vencimento < hoje:
-            dias_atraso = (hoje - m.vencimento).days
-            multa = Decimal("30.00")
-
-        m.dias_atraso = dias_atraso
-        m.multa_calculada = multa
-        m.valor_atualizado = valor_original + multa
-
     # =========================
     # TURMAS
     # =========================
@@ -163,6 +143,8 @@ def listar_mensalidades(request):
         "inadimplencia": round(inadimplencia, 2),
         "previsao_receita": previsao_receita,
         "quantidade_vencidas": quantidade_vencidas,
+        "total_a_receber": total_a_receber,
+        "ordenar": ordenar,
 
         "turmas": turmas,
         "mes_selecionado": mes,
@@ -178,16 +160,35 @@ def listar_mensalidades(request):
         context
     )
 # =========================
-# EXPORTAR CSV (COM FILTRO)
+# FILTROS DE EXPORTAÇÃO
 # =========================
 
-def exportar_csv(request):
+EXPORT_CHUNK_SIZE = 2000
+
+
+def _data_param(valor):
+    try:
+        return parse_date(valor) if valor else None
+    except ValueError:
+        return None
 
-    escola = request.escola
 
+def _mensalidades_para_exportar(request):
+    """
+    Mensalidades da escola filtradas pelos parâmetros da exportação:
+    mes/ano de referência, turma, status (pago/pendente/vencido) e
+    vencimento entre de/ate (YYYY-MM-DD).
+    """
+
+    escola = request.escola
+    hoje = date.today()
 
     mes = request.GET.get("mes")
     ano = request.GET.get("ano")
+    turma_id = request.GET.get("turma")
+    status = request.GET.get("status")
+    data_de = _data_param(request.GET.get("de"))
+    data_ate = _data_param(request.GET.get("ate"))
 
     mensalidades = Mensalidade.objects.filter(escola=escola)
 
@@ -196,21 +197,59 @@ def exportar_csv(request):
             mes_referencia=int(mes),
             ano_referencia=int(ano)
         )
+    elif ano:
+        mensalidades = mensalidades.filter(ano_referencia=int(ano))
 
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename=mensalidades.csv'
+    if turma_id:
+        mensalidades = mensalidades.filter(aluno__turmas=turma_id)
 
-    writer = csv.writer(response)
-    writer.writerow(['Aluno', 'Mês', 'Ano', 'Valor', 'Status'])
+    if status == "pago":
+        mensalidades = mensalidades.filter(status="pago")
+    elif status == "pendente":
+        mensalidades = mensalidades.filter(status="pendente", vencimento__gte=hoje)
+    elif status == "vencido":
+        mensalidades = mensalidades.filter(status="pendente", vencimento__lt=hoje)
+
+    if data_de:
+        mensalidades = mensalidades.filter(vencimento__gte=data_de)
+
+    if data_ate:
+        mensalidades = mensalidades.filter(vencimento__lte=data_ate)
+
+    return mensalidades
 
-    for m in mensalidades:
-        writer.writerow([
-            m.aluno.nome,
-            m.mes_referencia,
-            m.ano_referencia,
-            m.valor_final,
-            m.status
-        ])
+
+class _Echo:
+    """Pseudo-buffer para o csv.writer devolver a linha em vez de gravá-la."""
+
+    def write(self, value):
+        return value
+
+
+# =========================
+# EXPORTAR CSV (COM FILTRO)
+# =========================
+
+def exportar_csv(request):
+
+    linhas = _mensalidades_para_exportar(request).values_list(
+        "aluno__nome",
+        "mes_referencia",
+        "ano_referencia",
+        "valor_final",
+        "status",
+    )
+
+    writer = csv.writer(_Echo())
+
+    def gerar():
+        yield writer.writerow(['Aluno', 'Mês', 'Ano', 'Valor', 'Status'])
+
+        for linha in linhas.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            yield writer.writerow(linha)
+
+    response = StreamingHttpResponse(gerar(), content_type='text/csv')
+    response['Content-Disposition'] = 'attachment; filename=mensalidades.csv'
 
     return response
 
@@ -219,45 +258,126 @@ def exportar_csv(request):
 # EXPORTAR EXCEL (COM FILTRO)
 # =========================
 
+def _status_resumo(contagem):
+    return ", ".join(f"{status}: {qtd}" for status, qtd in sorted(contagem.items()))
+
+
+def _titulo_aba(titulo):
+    # Excel limita o nome da aba a 31 caracteres e proíbe alguns símbolos
+    for c in '[]:*?/\\':
+        titulo = titulo.replace(c, "-")
+    return titulo[:31]
+
+
 def exportar_excel(request):
+    """
+    Exporta as mensalidades filtradas em .xlsx (openpyxl write_only),
+    gravado em arquivo temporário e enviado em blocos.
 
-    escola = request.escola
+    Com ?por_turma=1, gera uma aba por turma (turma principal do aluno)
+    e uma aba "Resumo" com os totais de cada turma.
+    """
 
+    from openpyxl import Workbook
 
-    mes = request.GET.get("mes")
-    ano = request.GET.get("ano")
+    por_turma = request.GET.get("por_turma") == "1"
 
-    mensalidades = Mensalidade.objects.filter(escola=escola)
+    linhas = _mensalidades_para_exportar(request).values_list(
+        "aluno__turma_principal__nome",
+        "aluno__nome",
+        "mes_referencia",
+        "ano_referencia",
+        "valor_final",
+        "status",
+    )
 
-    if mes and ano:
-        mensalidades = mensalidades.filter(
-            mes_referencia=int(mes),
-            ano_referencia=int(ano)
+    if por_turma:
+        linhas = linhas.order_by(
+            "aluno__turma_principal__nome",
+            "aluno__nome",
+            "ano_referencia",
+            "mes_referencia",
         )
 
-    wb = Workbook()
-    ws = wb.active
+    cabecalho = ['Aluno', 'Mês', 'Ano', 'Valor', 'Status']
 
-    ws.append(['Aluno', 'Mês', 'Ano', 'Valor', 'Status'])
+    wb = Workbook(write_only=True)
 
-    for m in mensalidades:
-        ws.append([
-            m.aluno.nome,
-            m.mes_referencia,
-            m.ano_referencia,
-            float(m.valor_final),
-            m.status
-        ])
+    resumo = None
+    if por_turma:
+        resumo = wb.create_sheet("Resumo")
+        resumo.append(['Turma', 'Mensalidades', 'Valor', 'Status'])
 
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
+    # Cada aba é escrita em sequência; ao trocar de turma a aba anterior
+    # recebe a linha de total e entra no resumo.
+    abas = []
 
-    response['Content-Disposition'] = 'attachment; filename=mensalidades.xlsx'
+    def nova_aba(titulo):
+        ws = wb.create_sheet(_titulo_aba(titulo))
+        ws.append(cabecalho)
+        abas.append({"ws": ws, "total": Decimal("0.00"), "contagem": {}})
+        return abas[-1]
 
-    wb.save(response)
+    def fechar_aba(aba):
+        aba["ws"].append(
+            ["TOTAL", None, None, float(aba["total"]), _status_resumo(aba["contagem"])]
+        )
 
-    return response
+        if resumo is not None:
+            resumo.append([
+                aba["ws"].title,
+                sum(aba["contagem"].values()),
+                float(aba["total"]),
+                _status_resumo(aba["contagem"]),
+            ])
+
+    aba = None
+    turma_atual = None
+
+    for turma, aluno, mes, ano, valor, status in linhas.iterator(
+        chunk_size=EXPORT_CHUNK_SIZE
+    ):
+
+        if aba is None or (por_turma and turma != turma_atual):
+
+            if aba is not None:
+                fechar_aba(aba)
+
+            aba = nova_aba((turma or "Sem turma") if por_turma else "Mensalidades")
+            turma_atual = turma
+
+        aba["ws"].append([aluno, mes, ano, float(valor), status])
+        aba["total"] += valor
+        aba["contagem"][status] = aba["contagem"].get(status, 0) + 1
+
+    if aba is None:
+        aba = nova_aba("Mensalidades")
+
+    fechar_aba(aba)
+
+    if resumo is not None:
+        contagem_geral = {}
+        for a in abas:
+            for status, qtd in a["contagem"].items():
+                contagem_geral[status] = contagem_geral.get(status, 0) + qtd
+
+        resumo.append([
+            "TOTAL",
+            sum(contagem_geral.values()),
+            float(sum((a["total"] for a in abas), Decimal("0.00"))),
+            _status_resumo(contagem_geral),
+        ])
+
+    arquivo = tempfile.TemporaryFile(suffix=".xlsx")
+    wb.save(arquivo)
+    arquivo.seek(0)
+
+    return FileResponse(
+        arquivo,
+        as_attachment=True,
+        filename="mensalidades.xlsx",
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    )
 
 
 # =========================
@@ -289,6 +409,23 @@ def dar_baixa_mensalidade(request, mensalidade_id):
         mensalidade.pago_em = timezone.now()
         mensalidade.save()
 
+        # 📒 lançamento no fluxo de caixa
+        Pagamento.objects.create(
+            mensalidade=mensalidade,
+            escola=mensalidade.escola,
+            valor=mensalidade.valor_final,
+            metodo="manual",
+            data_pagamento=mensalidade.pago_em,
+        )
+
+        invalidar_kpis(mensalidade.escola_id)
+
+        # 🧾 recibo gerado uma vez e guardado
+        try:
+            salvar_recibo(mensalidade)
+        except Exception:
+            logger.exception("Falha ao gerar recibo da mensalidade %s", mensalidade.id)
+
         return JsonResponse({"success": True})
 
     except Mensalidade.DoesNotExist:
@@ -318,9 +455,6 @@ def gerar_mensalidades(request):
 
     if request.method == "POST":
 
-        print("\n=== DEBUG GERAÇÃO DE MENSALIDADES ===")
-        print("POST:", request.POST)
-
         turma_id = request.POST.get("turma_id")
         mes_inicio = int(request.POST.get("mes_inicio"))
         mes_fim = int(request.POST.get("mes_fim"))
@@ -328,9 +462,6 @@ def gerar_mensalidades(request):
         valor = Decimal(request.POST.get("valor"))
         dia_vencimento = int(request.POST.get("dia_vencimento"))
 
-        print(f"Turma ID: {turma_id}")
-        print(f"Período: {mes_inicio} até {mes_fim} / {ano}")
-
         # -------------------------------
         # Validações
         # -------------------------------
@@ -348,8 +479,6 @@ def gerar_mensalidades(request):
             messages.error(request, "Turma não encontrada.")
             return redirect("gerar_mensalidades")
 
-        print("Turma encontrada:", turma)
-
         # -------------------------------
         # 🔥 CORREÇÃO AQUI (ManyToMany)
         # -------------------------------
@@ -358,8 +487,6 @@ def gerar_mensalidades(request):
             escola=escola
         )
 
-        print("ALUNOS ENCONTRADOS:", alunos.count())
-
         # 🚨 proteção contra bug silencioso
         if not alunos.exists():
             messages.warning(
@@ -368,55 +495,22 @@ def gerar_mensalidades(request):
             )
             return redirect("gerar_mensalidades")
 
-        criadas = 0
-        ignoradas = 0
-
         # -------------------------------
-        # Geração
+        # Geração (em lote)
         # -------------------------------
-        for mes in range(mes_inicio, mes_fim + 1):
-
-            ultimo_dia = calendar.monthrange(ano, mes)[1]
-
-            for aluno in alunos:
-
-                print(f"Processando: {aluno.nome} - {mes}/{ano}")
-
-                dia_aluno = aluno.dia_vencimento or dia_vencimento
-                dia_final = min(dia_aluno, ultimo_dia)
-
-                vencimento = date(ano, mes, dia_final)
-
-                desconto_auto = Decimal(aluno.desconto_mensal or 0)
-
-                valor_original = Decimal(valor)
-                valor_final = valor_original - desconto_auto
-
-                if valor_final < Decimal("0.00"):
-                    valor_final = Decimal("0.00")
-
-                mensalidade, created = Mensalidade.objects.get_or_create(
-
-                    aluno=aluno,
-                    mes_referencia=mes,
-                    ano_referencia=ano,
-
-                    defaults={
-                        "escola": escola,
-                        "valor_original": valor_original,
-                        "desconto": desconto_auto,
-                        "valor_final": valor_final,
-                        "vencimento": vencimento,
-                        "status": "pendente"
-                    }
-                )
-
-                if created:
-                    criadas += 1
-                else:
-                    ignoradas += 1
+        criadas, ignoradas = gerar_mensalidades_em_lote(
+            escola,
+            alunos,
+            range(mes_inicio, mes_fim + 1),
+            ano,
+            valor,
+            dia_vencimento,
+        )
 
-        print(f"\nRESULTADO → Criadas: {criadas} | Ignoradas: {ignoradas}")
+        logger.info(
+            "Mensalidades geradas para turma %s (%s-%s/%s): %s criadas, %s ignoradas",
+            turma.id, mes_inicio, mes_fim, ano, criadas, ignoradas,
+        )
 
         messages.success(
             request,
@@ -442,6 +536,12 @@ def estornar_mensalidade(request, id):
 
     mensalidade.save()
 
+    # estorno retira o recebimento do fluxo de caixa
+    mensalidade.pagamentos.all().delete()
+
+    invalidar_kpis(mensalidade.escola_id)
+    descartar_recibo(mensalidade)
+
     return JsonResponse({"success": True})
 
 
@@ -457,6 +557,13 @@ def atualizar_desconto(request, id):
         m = Mensalidade.objects.get(id=id, escola=request.escola
 )
 
+        # 🔒 paga: valor já lançado no fluxo de caixa e no recibo guardado
+        if m.status == "pago":
+            return JsonResponse({
+                "success": False,
+                "error": "Não é possível alterar o desconto de uma mensalidade paga."
+            }, status=400)
+
         m.desconto = desconto
         m.valor_final = m.valor_original - desconto
 
@@ -465,7 +572,50 @@ def atualizar_desconto(request, id):
 
         m.save()
 
+        invalidar_kpis(m.escola_id)
+
         return JsonResponse({
             "success": True,
             "valor_formatado": f"R$ {m.valor_final:.2f}".replace(".", ",")
-        })
\ No newline at end of file
+        })
+
+
+# =========================
+# CONCILIAÇÃO DE EXTRATO
+# =========================
+
+@login_required
+def conciliar_extrato_view(request):
+
+    if request.method == "POST" and request.FILES.get("arquivo"):
+
+        metodo = request.POST.get("metodo") or "pix"
+
+        if metodo not in dict(Pagamento._meta.get_field("metodo").choices):
+            metodo = "pix"
+
+        linhas = ler_extrato(request.FILES["arquivo"])
+
+        conciliadas, nao_conciliadas = conciliar_extrato(
+            request.escola,
+            linhas,
+            metodo=metodo,
+        )
+
+        return render(
+            request,
+            "financeiro/conciliacao.html",
+            {
+                "processado": True,
+                "total_linhas": len(linhas),
+                "conciliadas": conciliadas,
+                "nao_conciliadas": nao_conciliadas,
+                "valor_conciliado": sum(
+                    (item["linha"]["valor"] for item in conciliadas),
+                    Decimal("0.00"),
+                ),
+            }
+        )
+
+    return render(request, "financeiro/conciliacao.html", {})
+
@@ -1,21 +1,38 @@
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
+from django.core.exceptions import PermissionDenied
 
 UserModel = get_user_model()
 
+_NAO_INFORMADO = object()
+
+
 class CPFBackend(ModelBackend):
-    def authenticate(self, request, username=None, password=None, **kwargs):
-        try:
-            # tenta autenticar por CPF
-            user = UserModel.objects.get(cpf=username)
-        except UserModel.DoesNotExist:
-            try:
-                # fallback para username (exigido pelo Django Admin)
-                user = UserModel.objects.get(username=username)
-            except UserModel.DoesNotExist:
+    def authenticate(self, request, username=None, password=None, usuario=_NAO_INFORMADO, **kwargs):
+
+        # login_view já buscou o usuário: não repete a query
+        if usuario is _NAO_INFORMADO:
+            if username is None or password is None:
                 return None
+            usuario = self.buscar_usuario(username)
+
+        if usuario is None:
+            # mesmo custo de um hash real, para não revelar se o CPF existe
+            UserModel().set_password(password)
+            raise PermissionDenied
+
+        if usuario.check_password(password) and self.user_can_authenticate(usuario):
+            return usuario
 
-        if user.check_password(password) and self.user_can_authenticate(user):
-            return user
-        return None
+        # encerra aqui: sem isso o ModelBackend buscaria e hashearia de novo
+        raise PermissionDenied
 
+    @staticmethod
+    def buscar_usuario(identificador):
+        # tenta por CPF e, em fallback, por username (exigido pelo Django Admin)
+        usuarios = list(
+            UserModel.objects.filter(cpf=identificador)[:1]
+        ) or list(
+            UserModel.objects.filter(username=identificador)[:1]
+        )
+        return usuarios[0] if usuarios else None
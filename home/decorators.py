@@ -2,20 +2,18 @@
 from functools import wraps
 from django.shortcuts import redirect
 
+from home.roles import tem_papel
+
 def role_required(roles):
     def decorator(view_func):
+        @wraps(view_func)
         def wrapper(request, *args, **kwargs):
 
-            # NOVO (multi-role)
-            if request.user.roles.filter(nome__in=roles).exists():
-                return view_func(request, *args, **kwargs)
-
-            # ANTIGO (fallback)
-            if request.user.role in roles:
+            # papéis M2M + legado + UserEscola, em cache (home/roles.py)
+            if tem_papel(request.user, roles):
                 return view_func(request, *args, **kwargs)
 
             return redirect('sem_permissao')
 
         return wrapper
     return decorator
-
@@ -0,0 +1,161 @@
+"""
+Proteção do login contra força bruta / credential stuffing.
+
+- Contador de falhas no cache por CPF e por IP: atingido o limite, a
+  tentativa é recusada antes de qualquer hash de senha. Os contadores
+  ficam no cache padrão: sem CACHE_BACKEND compartilhado cada worker do
+  gunicorn conta sozinho, e o limite efetivo é multiplicado pelo número
+  de workers (x3 com --workers=3).
+- LoginLog das tentativas com falha gravado na hora (trilha de
+  segurança); o dos logins bem-sucedidos vai em lote (bulk_create) por
+  um buffer em memória, que se perde se o worker for morto (SIGKILL,
+  OOM, timeout do gunicorn) antes de gravar, até LOGINLOG_LOTE registros
+  ou LOGINLOG_INTERVALO segundos.
+"""
+
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+LOGIN_MAX_FALHAS_CPF = getattr(settings, "LOGIN_MAX_FALHAS_CPF", 5)
+LOGIN_MAX_FALHAS_IP = getattr(settings, "LOGIN_MAX_FALHAS_IP", 30)
+LOGIN_JANELA_BLOQUEIO = getattr(settings, "LOGIN_JANELA_BLOQUEIO", 60 * 15)
+
+# Proxies reversos na frente do Django que acrescentam o IP do cliente ao
+# X-Forwarded-For. O valor mais à esquerda do cabeçalho vem do cliente e
+# não serve para o limite por IP.
+PROXIES_CONFIAVEIS = getattr(settings, "PROXIES_CONFIAVEIS", 0)
+
+LOGINLOG_LOTE = 50
+LOGINLOG_INTERVALO = 5
+
+
+def ip_do_cliente(request):
+    """
+    IP usado no contador de falhas: REMOTE_ADDR sem proxy; com
+    PROXIES_CONFIAVEIS = N, o N-ésimo endereço do X-Forwarded-For a partir
+    da direita (o que o proxy mais externo viu).
+    """
+    remoto = request.META.get("REMOTE_ADDR")
+
+    if not PROXIES_CONFIAVEIS:
+        return remoto
+
+    saltos = [
+        ip.strip()
+        for ip in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",")
+        if ip.strip()
+    ]
+
+    if len(saltos) < PROXIES_CONFIAVEIS:
+        return remoto
+
+    return saltos[-PROXIES_CONFIAVEIS]
+
+
+# -----------------------------------
+# Contador de falhas
+# -----------------------------------
+
+def _chaves(cpf, ip):
+    return f"login:falhas:cpf:{cpf}", f"login:falhas:ip:{ip}"
+
+
+def login_bloqueado(cpf, ip):
+    chave_cpf, chave_ip = _chaves(cpf, ip)
+    falhas = cache.get_many([chave_cpf, chave_ip])
+
+    return (
+        falhas.get(chave_cpf, 0) >= LOGIN_MAX_FALHAS_CPF
+        or falhas.get(chave_ip, 0) >= LOGIN_MAX_FALHAS_IP
+    )
+
+
+def registrar_falha(cpf, ip):
+    for chave in _chaves(cpf, ip):
+        # add só cria se não existir: a janela conta da primeira falha
+        cache.add(chave, 0, LOGIN_JANELA_BLOQUEIO)
+        try:
+            cache.incr(chave)
+        except ValueError:
+            cache.set(chave, 1, LOGIN_JANELA_BLOQUEIO)
+
+
+def limpar_falhas(cpf):
+    # o contador do IP continua: um acerto não libera o IP para o resto
+    cache.delete(_chaves(cpf, None)[0])
+
+
+# -----------------------------------
+# LoginLog em lote
+# -----------------------------------
+
+_pendentes = []
+_lock = threading.Lock()
+_timer = None
+
+
+def registrar_login_log(**campos):
+    """
+    Grava o LoginLog de uma falha na hora; o de um login bem-sucedido é
+    enfileirado e o lote é gravado ao chegar a LOGINLOG_LOTE registros ou
+    LOGINLOG_INTERVALO segundos depois do primeiro.
+    """
+    from home.models import LoginLog
+
+    global _timer
+
+    if not campos.get("sucesso"):
+        try:
+            LoginLog.objects.create(**campos)
+        except Exception:
+            logger.exception("Falha ao gravar LoginLog de tentativa recusada")
+        return
+
+    with _lock:
+        _pendentes.append(LoginLog(**campos))
+        cheio = len(_pendentes) >= LOGINLOG_LOTE
+
+        if not cheio and _timer is None:
+            _timer = threading.Timer(LOGINLOG_INTERVALO, _descarregar_em_segundo_plano)
+            _timer.daemon = True
+            _timer.start()
+
+    if cheio:
+        descarregar_login_logs()
+
+
+def descarregar_login_logs():
+    from home.models import LoginLog
+
+    global _timer
+
+    with _lock:
+        lote = _pendentes[:]
+        _pendentes.clear()
+
+        if _timer is not None:
+            _timer.cancel()
+            _timer = None
+
+    if not lote:
+        return
+
+    try:
+        LoginLog.objects.bulk_create(lote, batch_size=LOGINLOG_LOTE)
+    except Exception:
+        logger.exception("Falha ao gravar %s registros de LoginLog", len(lote))
+
+
+def _descarregar_em_segundo_plano():
+    descarregar_login_logs()
+    close_old_connections()
+
+
+atexit.register(descarregar_login_logs)
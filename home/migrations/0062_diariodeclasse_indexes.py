@@ -0,0 +1,21 @@
+# Generated by Django 5.0.7 on 2026-10-19 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0061_boletim'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='diariodeclasse',
+            index=models.Index(fields=['escola', 'data_ministrada'], name='diario_escola_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='diariodeclasse',
+            index=models.Index(fields=['turma', 'disciplina', 'data_ministrada'], name='diario_turma_disc_data_idx'),
+        ),
+    ]
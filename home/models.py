@@ -4,6 +4,7 @@ from django.core.validators import RegexValidator
 from django.core.exceptions import ValidationError
 import uuid
 from home.utils_core import gerar_matricula_unica
+from auditoria.querysets import AuditoriaQuerySet
 import random
 import string
 
@@ -574,6 +575,16 @@ class DiarioDeClasse(models.Model):
         verbose_name = "Diário de Classe"
         verbose_name_plural = "Diários de Classe"
         ordering = ["-data_ministrada", "-criado_em"]
+        indexes = [
+            models.Index(
+                fields=["escola", "data_ministrada"],
+                name="diario_escola_data_idx",
+            ),
+            models.Index(
+                fields=["turma", "disciplina", "data_ministrada"],
+                name="diario_turma_disc_data_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.turma} - {self.data_ministrada}"
@@ -1162,6 +1173,9 @@ class Boletim(models.Model):
     criado_em = models.DateTimeField(auto_now_add=True)
     atualizado_em = models.DateTimeField(auto_now=True)
 
+    # update(pdf=None) em lancar_notas fica registrado na auditoria
+    objects = AuditoriaQuerySet.as_manager()
+
     class Meta:
         unique_together = ("aluno", "turma")
 
@@ -0,0 +1,99 @@
+"""
+Papéis efetivos do usuário: M2M User.roles + campo legado User.role +
+UserEscola.roles da escola ativa.
+
+O conjunto é calculado uma vez por request (memo no próprio objeto user).
+Com cache compartilhado entre os workers (CACHE_BACKEND), também fica no
+cache entre requests, com uma chave que inclui um contador de versão por
+usuário e um global; os sinais em home/signals.py incrementam esses
+contadores quando papéis mudam. Com o locmem (um por processo) o
+incremento não chegaria aos outros workers e um papel revogado
+continuaria valendo neles, então só o memo da request é usado.
+"""
+
+from django.core.cache import cache
+
+from core.cache import cache_compartilhado
+
+ROLES_CACHE_TIMEOUT = 60 * 5
+
+
+def _versao_usuario_key(user_id):
+    return f"home:roles:versao:{user_id}"
+
+
+_VERSAO_GLOBAL_KEY = "home:roles:versao"
+
+
+def _incrementar(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def invalidar_papeis(user_id=None):
+    """Descarta os papéis em cache de um usuário (ou de todos, sem user_id)."""
+    _incrementar(_versao_usuario_key(user_id) if user_id else _VERSAO_GLOBAL_KEY)
+
+
+def vincular_escola(user, escola_id):
+    """Escola ativa usada por papeis_do_usuario (chamado pelo EscolaAtivaMiddleware)."""
+    user._papeis_escola_id = escola_id
+
+
+def _calcular(user, escola_id):
+    from home.models import UserEscola
+
+    papeis = set(user.roles.values_list("nome", flat=True))
+
+    if user.role:
+        papeis.add(user.role)
+
+    if escola_id:
+        papeis.update(
+            UserEscola.objects
+            .filter(user=user, escola_id=escola_id)
+            .values_list("roles__nome", flat=True)
+        )
+        papeis.discard(None)
+
+    return frozenset(papeis)
+
+
+def papeis_do_usuario(user):
+    """frozenset com os nomes dos papéis efetivos do usuário."""
+
+    if not getattr(user, "is_authenticated", False):
+        return frozenset()
+
+    escola_id = getattr(user, "_papeis_escola_id", None)
+
+    memo = user.__dict__.setdefault("_papeis_memo", {})
+    if escola_id in memo:
+        return memo[escola_id]
+
+    if not cache_compartilhado():
+        papeis = memo[escola_id] = _calcular(user, escola_id)
+        return papeis
+
+    versoes = cache.get_many([_VERSAO_GLOBAL_KEY, _versao_usuario_key(user.pk)])
+    key = "home:roles:{}:{}:{}:{}".format(
+        user.pk,
+        escola_id or 0,
+        versoes.get(_VERSAO_GLOBAL_KEY, 0),
+        versoes.get(_versao_usuario_key(user.pk), 0),
+    )
+
+    papeis = cache.get(key)
+
+    if papeis is None:
+        papeis = _calcular(user, escola_id)
+        cache.set(key, papeis, ROLES_CACHE_TIMEOUT)
+
+    memo[escola_id] = papeis
+    return papeis
+
+
+def tem_papel(user, roles):
+    return not papeis_do_usuario(user).isdisjoint(roles)
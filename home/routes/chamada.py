@@ -4,6 +4,7 @@ from home.views.chamada_aluno import (
     api_carregar_alunos,
     salvar_presencas,
     listar_chamadas,
+    api_calendario_chamadas,
     detalhe_chamada,
     pdf_chamada,
     editar_chamada,
@@ -42,6 +43,7 @@ urlpatterns = [
     # APIs
     path("api/carregar_alunos/<int:turma_id>/", api_carregar_alunos, name="api_carregar_alunos"),
     path("api/disciplinas_por_turma/<int:turma_id>/", disciplinas_por_turma, name="disciplinas_por_turma"),
+    path("api/calendario/", api_calendario_chamadas, name="api_calendario_chamadas"),
 
     # Exportações
     path("relatorios/resumo-mensal/csv/", export_resumo_mensal_csv, name="export_resumo_mensal_csv"),
@@ -1,8 +1,10 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 from .models import Docente
 from django.dispatch import receiver
-from .models import User, Docente
+from .models import User, Docente, Escola, AnoLetivo, Role, UserEscola
+from .roles import invalidar_papeis
+from .tenant import invalidar_anos, invalidar_escola
 
 @receiver(post_save, sender=Docente)
 def preencher_escola_docente(sender, instance, created, **kwargs):
@@ -10,3 +12,58 @@ def preencher_escola_docente(sender, instance, created, **kwargs):
         instance.escola = instance.user.escola
         instance.save()
 
+
+# 🔹 cache de tenant (home/tenant.py)
+@receiver([post_save, post_delete], sender=Escola)
+def invalidar_cache_escola(sender, instance, **kwargs):
+    invalidar_escola(instance.id)
+
+
+@receiver([post_save, post_delete], sender=AnoLetivo)
+def invalidar_cache_ano_letivo(sender, instance, **kwargs):
+    invalidar_anos()
+
+
+# 🔹 cache de papéis (home/roles.py)
+@receiver(m2m_changed, sender=User.roles.through)
+def invalidar_papeis_user_roles(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+
+    if not reverse:
+        invalidar_papeis(instance.pk)
+    elif pk_set:
+        for user_id in pk_set:
+            invalidar_papeis(user_id)
+    else:
+        invalidar_papeis()
+
+
+@receiver(m2m_changed, sender=UserEscola.roles.through)
+def invalidar_papeis_userescola_roles(sender, instance, action, reverse, **kwargs):
+    if not action.startswith("post_"):
+        return
+
+    if reverse:
+        invalidar_papeis()
+    else:
+        invalidar_papeis(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidar_papeis_user(sender, instance, **kwargs):
+    # login só grava last_login: não mexe em papéis
+    update_fields = kwargs.get("update_fields")
+    if update_fields and set(update_fields) <= {"last_login"}:
+        return
+    invalidar_papeis(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=UserEscola)
+def invalidar_papeis_userescola(sender, instance, **kwargs):
+    invalidar_papeis(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=Role)
+def invalidar_papeis_role(sender, instance, **kwargs):
+    invalidar_papeis()
@@ -1,14 +1,15 @@
 from django import template
 
+from home.roles import tem_papel
+
 register = template.Library()
 
 @register.filter
 def has_role(user, roles):
     if getattr(user, 'is_superuser', False):
         return True
-    if not hasattr(user, 'role'):
-        return False
-    return user.role in [r.strip() for r in roles.split(',')]
+    # conjunto calculado uma vez por request (home/roles.py)
+    return tem_papel(user, [r.strip() for r in roles.split(',')])
 
 @register.filter
 def get_item(dictionary, key):
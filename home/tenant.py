@@ -0,0 +1,184 @@
+"""
+Contexto da escola ativa (tenant) por request.
+
+Escola e ano letivo ativo ficam num cache LRU com TTL, em memória de cada
+processo, e são invalidados pelos sinais de save/delete de Escola e
+AnoLetivo (ver home/signals.py). Em outros processos a mudança aparece
+quando o TTL expira.
+
+Cada request recebe uma instância própria, montada a partir dos valores
+em cache com Model.from_db (sem query): alterações feitas por uma view
+não vazam para outras requests.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+TENANT_CACHE_TTL = 300
+TENANT_CACHE_MAX = 256
+
+_VAZIO = object()
+
+
+class CacheTTL:
+    """LRU com expiração, seguro entre threads."""
+
+    def __init__(self, maximo=TENANT_CACHE_MAX, ttl=TENANT_CACHE_TTL):
+        self.maximo = maximo
+        self.ttl = ttl
+        self._dados = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, chave, padrao=None):
+        with self._lock:
+            item = self._dados.get(chave)
+
+            if item is None:
+                return padrao
+
+            expira_em, valor = item
+
+            if expira_em < time.monotonic():
+                del self._dados[chave]
+                return padrao
+
+            self._dados.move_to_end(chave)
+            return valor
+
+    def set(self, chave, valor):
+        with self._lock:
+            self._dados[chave] = (time.monotonic() + self.ttl, valor)
+            self._dados.move_to_end(chave)
+
+            while len(self._dados) > self.maximo:
+                self._dados.popitem(last=False)
+
+    def pop(self, chave):
+        with self._lock:
+            self._dados.pop(chave, None)
+
+    def clear(self):
+        with self._lock:
+            self._dados.clear()
+
+
+_escolas = CacheTTL()
+_anos = CacheTTL(maximo=1)
+
+
+def _retrato(instancia):
+    campos = [f.attname for f in instancia._meta.concrete_fields]
+    return instancia._state.db, campos, [getattr(instancia, c) for c in campos]
+
+
+def _instancia(model, retrato):
+    db, campos, valores = retrato
+    return model.from_db(db, campos, valores)
+
+
+# -----------------------------------
+# Escola / ano letivo em cache
+# -----------------------------------
+
+def escola_por_id(escola_id):
+    from home.models import Escola
+
+    if not escola_id:
+        return None
+
+    retrato = _escolas.get(escola_id)
+
+    if retrato is None:
+        escola = Escola.objects.filter(id=escola_id).first()
+        if escola is None:
+            return None
+        retrato = _retrato(escola)
+        _escolas.set(escola_id, retrato)
+
+    return _instancia(Escola, retrato)
+
+
+def ano_letivo_ativo():
+    from home.models import AnoLetivo
+
+    retrato = _anos.get("ativo", _VAZIO)
+
+    if retrato is _VAZIO:
+        ano = AnoLetivo.objects.filter(ativo=True, encerrado=False).first()
+        retrato = _retrato(ano) if ano else None
+        _anos.set("ativo", retrato)
+
+    return _instancia(AnoLetivo, retrato) if retrato else None
+
+
+def invalidar_escola(escola_id):
+    _escolas.pop(escola_id)
+
+
+def invalidar_anos():
+    _anos.clear()
+
+
+# -----------------------------------
+# Contexto da request
+# -----------------------------------
+
+@dataclass
+class TenantContext:
+    escola: object = None
+    ano_letivo: object = None
+
+    @property
+    def tema(self):
+        return self.escola.tema if self.escola else None
+
+    @property
+    def financeiro_ativo(self):
+        return bool(self.escola and self.escola.financeiro_ativo)
+
+    @property
+    def base_template(self):
+        if self.tema == "nucleo":
+            return "nucleo/base_nucleo.html"
+        return "base.html"
+
+
+def resolver_tenant(request):
+    """
+    Monta o TenantContext da request a partir da escola na sessão. Sem
+    escola na sessão, usa o primeiro vínculo UserEscola do usuário e
+    grava na sessão (salva pelo SessionMiddleware na resposta).
+    """
+
+    escola = None
+
+    if request.user.is_authenticated:
+
+        escola = escola_por_id(request.session.get("escola_id"))
+
+        if not escola:
+            # 🔥 fallback automático
+            escola_id = (
+                request.user.userescola_set
+                .values_list("escola_id", flat=True)
+                .first()
+            )
+            if escola_id:
+                request.session["escola_id"] = escola_id
+                escola = escola_por_id(escola_id)
+
+    return TenantContext(escola=escola, ano_letivo=ano_letivo_ativo())
+
+
+def get_tenant(request):
+    """TenantContext da request, resolvido uma única vez."""
+
+    tenant = getattr(request, "tenant", None)
+
+    if tenant is None:
+        tenant = resolver_tenant(request)
+        request.tenant = tenant
+
+    return tenant
@@ -1,7 +1,9 @@
 from django.template.loader import get_template
+from django.http import FileResponse
 from datetime import datetime
 from django.utils import timezone
 import re
+import tempfile
 
 from collections import defaultdict
 
@@ -89,17 +91,57 @@ def get_client_ip(request):
 
 
 def get_escola_ativa(request):
-    from home.models import Escola
+    from home.tenant import escola_por_id
 
     escola_id = request.session.get("escola_id")
 
-    if escola_id:
-        try:
-            return Escola.objects.get(id=escola_id)
-        except Escola.DoesNotExist:
-            return None
+    # já resolvida pelo EscolaAtivaMiddleware nesta request
+    tenant = getattr(request, "tenant", None)
+    if tenant is not None and tenant.escola and tenant.escola.id == escola_id:
+        return tenant.escola
 
-    return None
+    return escola_por_id(escola_id)
+
+
+# Quantidade de linhas lidas do banco por vez ao montar PDFs longos
+PDF_CHUNK_SIZE = 500
+
+
+def pdf_arquivo_temporario():
+    """
+    Arquivo em disco para montar PDFs grandes sem manter o documento
+    inteiro em memória no worker.
+    """
+    return tempfile.TemporaryFile(suffix=".pdf")
+
+
+def pdf_streaming_response(arquivo, filename, as_attachment=False):
+    """
+    Devolve o PDF já gravado em `arquivo` em blocos (FileResponse),
+    fechando o arquivo temporário ao final do envio.
+    """
+    arquivo.seek(0)
+
+    return FileResponse(
+        arquivo,
+        as_attachment=as_attachment,
+        filename=filename,
+        content_type="application/pdf",
+    )
+
+
+def get_pyplot():
+    """
+    Carrega o matplotlib só quando o primeiro gráfico é gerado.
+    Usa o backend Agg, já que os workers não têm display.
+    """
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+    import matplotlib.pyplot as plt
+
+    return plt
 
 
 def arredondar_media_personalizada(media):
@@ -123,9 +165,10 @@ def arredondar_media_personalizada(media):
 
 
 def get_ano_ativo():
-    from .models import AnoLetivo
+    from home.tenant import ano_letivo_ativo
 
-    return AnoLetivo.objects.filter(ativo=True, encerrado=False).first()
+    # cache por processo, invalidado ao salvar um AnoLetivo
+    return ano_letivo_ativo()
 
 
 def get_turmas_ativas(escola, incluir_sem_ano=False):
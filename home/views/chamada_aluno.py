@@ -14,7 +14,6 @@ from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, TableStyle, Spacer
 from reportlab.lib import colors
 import csv
-from openpyxl import Workbook
 from django.db.models import Q, OuterRef, Subquery, F
 
 from home.models import Chamada
@@ -22,7 +21,8 @@ from django.core.paginator import Paginator
 
 import io
 import json
-from datetime import datetime
+from calendar import monthrange
+from datetime import date, datetime
 
 from home.models import (
     Turma,
@@ -34,6 +34,11 @@ from home.models import (
     Aluno,
     DiarioDeClasse
 )
+from home.utils import (
+    PDF_CHUNK_SIZE,
+    pdf_arquivo_temporario,
+    pdf_streaming_response,
+)
 
 import logging
 
@@ -121,15 +126,9 @@ def tela_chamada(request):
         key=lambda d: d.nome
     )
 
-    # -------------------------------------------------
-    # 🔥 NOVO: DATAS COM CHAMADA (para o calendário)
-    # -------------------------------------------------
-    datas_chamadas = Chamada.objects.filter(
-        diario__turma__escola=user.escola
-    ).values_list("diario__data_ministrada", flat=True).distinct()
-
     # -------------------------------------------------
     # RENDER
+    # (dias com chamada vêm de api_calendario_chamadas)
     # -------------------------------------------------
     return render(
         request,
@@ -138,7 +137,6 @@ def tela_chamada(request):
             "turmas": turmas,
             "disciplinas": disciplinas,
             "data_hoje": hoje,
-            "datas_chamadas": datas_chamadas,  # 👈 ESSA LINHA É A CHAVE
         }
     )
 
@@ -453,13 +451,6 @@ def listar_chamadas(request):
             escola=user.escola
         ).order_by("nome")
 
-    # =====================================================
-    # DATAS PARA O CALENDÁRIO
-    # =====================================================
-    datas_chamadas = Chamada.objects.filter(
-        diario__turma__escola=user.escola
-    ).values_list("diario__data_ministrada", flat=True).distinct()
-
     # =====================================================
     # FILTROS
     # =====================================================
@@ -524,9 +515,66 @@ def listar_chamadas(request):
             "filtro_data": filtro_data or "",
             "filtro_turma": filtro_turma or "",
             "filtro_disciplina": filtro_disciplina or "",
-            "datas_chamadas": datas_chamadas,
         }
     )
+
+
+# ======================================================
+# 4.1) API – CALENDÁRIO DE CHAMADAS (DIAS DO MÊS)
+# ======================================================
+@login_required
+def api_calendario_chamadas(request):
+    """
+    Dias do mês que já têm chamada, para destacar no calendário.
+
+    GET ?ano=YYYY&mes=MM[&turma=<id>][&disciplina=<id>]
+
+    Retorna {"ano", "mes", "dias"}, onde "dias" é um bitmap:
+    o bit (dia - 1) fica ligado quando existe chamada naquele dia.
+    """
+
+    acesso = get_professor_or_gestor(request.user)
+
+    if acesso == "bloqueado":
+        return JsonResponse({"error": "Acesso negado."}, status=403)
+
+    hoje = datetime.now().date()
+
+    try:
+        ano = int(request.GET.get("ano") or hoje.year)
+        mes = int(request.GET.get("mes") or hoje.month)
+        inicio = date(ano, mes, 1)
+    except ValueError:
+        return JsonResponse({"error": "Ano/mês inválidos."}, status=400)
+
+    fim = date(ano, mes, monthrange(ano, mes)[1])
+
+    chamadas = Chamada.objects.filter(
+        diario__escola=request.user.escola,
+        diario__data_ministrada__range=(inicio, fim),
+    )
+
+    turma_id = request.GET.get("turma")
+    disciplina_id = request.GET.get("disciplina")
+
+    if turma_id:
+        chamadas = chamadas.filter(diario__turma_id=turma_id)
+
+    if disciplina_id:
+        chamadas = chamadas.filter(diario__disciplina_id=disciplina_id)
+
+    datas = (
+        chamadas
+        .order_by()
+        .values_list("diario__data_ministrada", flat=True)
+        .distinct()
+    )
+
+    dias = 0
+    for data in datas:
+        dias |= 1 << (data.day - 1)
+
+    return JsonResponse({"ano": ano, "mes": mes, "dias": dias})
 # ======================================================
 # 5) DETALHE DA CHAMADA
 # ======================================================
@@ -867,13 +915,10 @@ def relatorio_chamadas_pdf(request):
         .order_by("diario__data_ministrada")
     )
 
-    response = HttpResponse(content_type="application/pdf")
-    response["Content-Disposition"] = (
-        f'inline; filename="relatorio_chamadas_{mes}_{ano}.pdf"'
-    )
+    arquivo = pdf_arquivo_temporario()
 
     doc = SimpleDocTemplate(
-        response,
+        arquivo,
         pagesize=A4,
         rightMargin=30,
         leftMargin=30,
@@ -910,21 +955,31 @@ def relatorio_chamadas_pdf(request):
     # ===============================
     # TABELA
     # ===============================
-    dados = [
-        [
-            "Data",
-            "Turma",
-            "Disciplina",
-            "Professor",
-            "Presentes",
-            "Ausentes",
-        ]
+    # Uma tabela por bloco de linhas: o reportlab não precisa quebrar
+    # (e copiar) uma única tabela gigante a cada página.
+    cabecalho = [
+        "Data",
+        "Turma",
+        "Disciplina",
+        "Professor",
+        "Presentes",
+        "Ausentes",
     ]
 
+    estilo_tabela = TableStyle([
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("ALIGN", (4, 1), (-1, -1), "CENTER"),
+        ("FONT", (0, 0), (-1, 0), "Helvetica-Bold"),
+    ])
+
+    larguras = [60, 90, 110, 130, 70, 70]
+
     total_presentes = 0
     total_ausentes = 0
+    dados = [cabecalho]
 
-    for chamada in chamadas:
+    for chamada in chamadas.iterator(chunk_size=PDF_CHUNK_SIZE):
         dados.append([
             chamada.diario.data_ministrada.strftime("%d/%m/%Y"),
             chamada.diario.turma.nome,
@@ -936,6 +991,12 @@ def relatorio_chamadas_pdf(request):
         total_presentes += chamada.presentes
         total_ausentes += chamada.ausentes
 
+        if len(dados) > PDF_CHUNK_SIZE:
+            tabela = Table(dados, colWidths=larguras, repeatRows=1)
+            tabela.setStyle(estilo_tabela)
+            elementos.append(tabela)
+            dados = [cabecalho]
+
     # Linha de totais
     dados.append([
         "",
@@ -946,21 +1007,20 @@ def relatorio_chamadas_pdf(request):
         total_ausentes,
     ])
 
-    tabela = Table(dados, repeatRows=1)
-
+    tabela = Table(dados, colWidths=larguras, repeatRows=1)
+    tabela.setStyle(estilo_tabela)
     tabela.setStyle(TableStyle([
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
         ("BACKGROUND", (0, -1), (-1, -1), colors.whitesmoke),
-        ("ALIGN", (4, 1), (-1, -1), "CENTER"),
-        ("FONT", (0, 0), (-1, 0), "Helvetica-Bold"),
         ("FONT", (0, -1), (-1, -1), "Helvetica-Bold"),
     ]))
 
     elementos.append(tabela)
 
     doc.build(elementos)
-    return response
+
+    return pdf_streaming_response(
+        arquivo, f"relatorio_chamadas_{mes}_{ano}.pdf"
+    )
 
 def resumo_mensal_turma_professor(request):
     hoje = timezone.now().date()
@@ -1138,6 +1198,8 @@ def export_resumo_mensal_excel(request):
         )
     )
 
+    from openpyxl import Workbook
+
     wb = Workbook()
     ws = wb.active
     ws.title = "Resumo Mensal"
@@ -1358,6 +1420,8 @@ def relatorio_anual_chamadas_excel(request):
         )
     )
 
+    from openpyxl import Workbook
+
     wb = Workbook()
     ws = wb.active
     ws.title = f"Chamadas {ano}"
@@ -6,17 +6,23 @@ from django.db.models import Count, Q, F
 from django.shortcuts import render, get_object_or_404
 
 from home.models import Presenca, Turma, Docente, Aluno
+from home.utils import (
+    PDF_CHUNK_SIZE,
+    get_pyplot,
+    pdf_arquivo_temporario,
+    pdf_streaming_response,
+)
 from django.http import HttpResponse
-import openpyxl
-from openpyxl.styles import Font, Alignment
 
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import cm
 from io import BytesIO
-import matplotlib.pyplot as plt
 from reportlab.lib.utils import ImageReader
 
+# openpyxl e matplotlib são importados dentro das views que os usam,
+# para não pesar no boot de todos os workers.
+
 
 
 @login_required
@@ -230,6 +236,9 @@ def export_presenca_aluno_mensal_excel(request):
     # ============================
     # CRIA EXCEL
     # ============================
+    import openpyxl
+    from openpyxl.styles import Font, Alignment
+
     wb = openpyxl.Workbook()
     ws = wb.active
 
@@ -369,10 +378,9 @@ def pdf_presenca_aluno_mensal(request):
     # ============================
     # PDF
     # ============================
-    response = HttpResponse(content_type="application/pdf")
-    response["Content-Disposition"] = f'inline; filename="{filename}"'
+    arquivo = pdf_arquivo_temporario()
 
-    pdf = canvas.Canvas(response, pagesize=A4)
+    pdf = canvas.Canvas(arquivo, pagesize=A4)
     largura, altura = A4
 
     # ============================
@@ -437,9 +445,9 @@ def pdf_presenca_aluno_mensal(request):
     pdf.setFont("Helvetica", 10)
 
     # ============================
-    # LINHAS
+    # LINHAS (lidas em blocos)
     # ============================
-    for r in resumo:
+    for r in resumo.iterator(chunk_size=PDF_CHUNK_SIZE):
 
         percentual = round(r["percentual"], 1)
 
@@ -491,7 +499,7 @@ def pdf_presenca_aluno_mensal(request):
     pdf.showPage()
     pdf.save()
 
-    return response
+    return pdf_streaming_response(arquivo, filename)
 
 @login_required
 def pdf_presenca_aluno_individual(request, aluno_id):
@@ -544,9 +552,14 @@ def pdf_presenca_aluno_individual(request, aluno_id):
             chamada__diario__turma_id=turma_id
         )
 
-    total_aulas = presencas.count()
-    presentes = presencas.filter(presente=True).count()
-    faltas = presencas.filter(presente=False).count()
+    totais = presencas.aggregate(
+        total_aulas=Count("id"),
+        presentes=Count("id", filter=Q(presente=True)),
+        faltas=Count("id", filter=Q(presente=False)),
+    )
+    total_aulas = totais["total_aulas"]
+    presentes = totais["presentes"]
+    faltas = totais["faltas"]
     percentual = (presentes * 100 / total_aulas) if total_aulas else 0
 
     # ============================
@@ -565,6 +578,8 @@ def pdf_presenca_aluno_individual(request, aluno_id):
     # ============================
     # GRÁFICO DONUT PROFISSIONAL
     # ============================
+    plt = get_pyplot()
+
     fig, ax = plt.subplots(figsize=(4, 4))
 
     colors = ["#2ecc71", "#e74c3c"]
@@ -599,12 +614,10 @@ def pdf_presenca_aluno_individual(request, aluno_id):
     # ============================
     # PDF
     # ============================
-    response = HttpResponse(content_type="application/pdf")
-    response["Content-Disposition"] = (
-        f'inline; filename=frequencia_{aluno.nome.replace(" ", "_")}.pdf'
-    )
+    arquivo = pdf_arquivo_temporario()
+    filename = f'frequencia_{aluno.nome.replace(" ", "_")}.pdf'
 
-    pdf = canvas.Canvas(response, pagesize=A4)
+    pdf = canvas.Canvas(arquivo, pagesize=A4)
     largura, altura = A4
 
     # ============================
@@ -706,4 +719,4 @@ def pdf_presenca_aluno_individual(request, aluno_id):
     pdf.showPage()
     pdf.save()
 
-    return response
\ No newline at end of file
+    return pdf_streaming_response(arquivo, filename)
@@ -13,7 +13,6 @@ from django.http import HttpResponse
 
 from django.template.loader import render_to_string
 from django.http import HttpResponse
-from weasyprint import HTML
 
 
 from home.models import (
@@ -651,6 +650,9 @@ def boletim_infantil_pdf(request, aluno_id, turma_id):
         }
     )
 
+    # weasyprint é pesado: carregado só quando um boletim é gerado
+    from weasyprint import HTML
+
     html = HTML(string=html_string)
     pdf = html.write_pdf()
 
@@ -15,6 +15,14 @@ from home.utils import (
     arredondar_media_personalizada,
 )
 from home.models import User, LoginLog, UserEscola
+from home.auth_backends import CPFBackend
+from home.login_protecao import (
+    ip_do_cliente,
+    limpar_falhas,
+    login_bloqueado,
+    registrar_falha,
+    registrar_login_log,
+)
 
 # ---- Django Core ----
 from django.conf import settings
@@ -49,21 +57,9 @@ from collections import defaultdict
 from home.utils import get_ano_ativo
 
 # ---- Third-Party ----
-import pandas as pd
+# pandas e reportlab são importados dentro de importar_alunos/aluno_pdf
 from babel.dates import format_date
 
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import cm
-from reportlab.platypus import (
-    SimpleDocTemplate,
-    Paragraph,
-    Spacer,
-    Table,
-    TableStyle,
-)
-
 # ---- Local Apps ----
 from .forms import EscolaForm
 
@@ -881,6 +877,18 @@ def salvar_aluno(request):
 
 @login_required
 def aluno_pdf(request, aluno_id):
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import cm
+    from reportlab.platypus import (
+        SimpleDocTemplate,
+        Paragraph,
+        Spacer,
+        Table,
+        TableStyle,
+    )
+
     aluno = get_object_or_404(Aluno, pk=aluno_id)
     escola = getattr(aluno, "escola", None) or getattr(request.user, "escola", None)
 
@@ -2276,22 +2284,28 @@ def login_view(request):
         )
         senha = request.POST.get("password")
         escola_id = request.POST.get("escola_id")
-        ip = get_client_ip(request)
+        ip = ip_do_cliente(request)
 
-        # 🔥 busca por CPF
-        try:
-            user_obj = User.objects.get(cpf=identificador)
-            username = user_obj.username
-        except User.DoesNotExist:
-            username = identificador
-            user_obj = None
+        # 🔒 muitas falhas para o CPF/IP: recusa antes de qualquer hash
+        if login_bloqueado(identificador, ip):
+            registrar_login_log(user=None, cpf=identificador, ip=ip, sucesso=False)
 
-        user = authenticate(request, username=username, password=senha)
+            form.add_error(None, "Muitas tentativas de login. Aguarde alguns minutos e tente novamente.")
+            return render(request, "pages/login.html", {"form": form})
+
+        # 🔥 busca por CPF (ou username) uma vez só; o CPFBackend reaproveita
+        user_obj = CPFBackend.buscar_usuario(identificador)
+
+        user = authenticate(
+            request,
+            username=user_obj.username if user_obj else identificador,
+            password=senha,
+            usuario=user_obj,
+        )
 
         if user is None:
-            LoginLog.objects.create(
-                user=user_obj, cpf=identificador, ip=ip, sucesso=False
-            )
+            registrar_falha(identificador, ip)
+            registrar_login_log(user=user_obj, cpf=identificador, ip=ip, sucesso=False)
 
             form.add_error(None, "CPF ou senha inválidos")
             return render(request, "pages/login.html", {"form": form})
@@ -2299,7 +2313,8 @@ def login_view(request):
         # ✅ login OK
         login(request, user)
 
-        LoginLog.objects.create(user=user, cpf=identificador, ip=ip, sucesso=True)
+        limpar_falhas(identificador)
+        registrar_login_log(user=user, cpf=identificador, ip=ip, sucesso=True)
 
         vinculos = UserEscola.objects.filter(user=user)
 
@@ -2415,6 +2430,8 @@ def importar_alunos(request):
     if request.method == "POST" and request.FILES.get("arquivo"):
         arquivo = request.FILES["arquivo"]
 
+        import pandas as pd
+
         try:
             df = pd.read_excel(arquivo)
 
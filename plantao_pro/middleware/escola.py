@@ -1,8 +1,7 @@
-from home.utils import get_escola_ativa
+from home.roles import vincular_escola
+from home.tenant import get_tenant
 
 
-from home.utils import get_escola_ativa
-
 class EscolaAtivaMiddleware:
 
     def __init__(self, get_response):
@@ -10,19 +9,13 @@ class EscolaAtivaMiddleware:
 
     def __call__(self, request):
 
-        if request.user.is_authenticated:
-            escola = get_escola_ativa(request)
+        # escola, ano letivo e tema vêm do cache em memória (home/tenant.py)
+        tenant = get_tenant(request)
 
-            if not escola:
-                # 🔥 fallback automático
-                vinculo = request.user.userescola_set.first()
-                if vinculo:
-                    request.session["escola_id"] = vinculo.escola.id
-                    request.session.save()
-                    escola = vinculo.escola
+        request.escola = tenant.escola if request.user.is_authenticated else None
 
-            request.escola = escola
-        else:
-            request.escola = None
+        if request.escola:
+            # UserEscola.roles considerados em role_required/has_role
+            vincular_escola(request.user, request.escola.id)
 
-        return self.get_response(request)
\ No newline at end of file
+        return self.get_response(request)
@@ -0,0 +1,37 @@
+import time
+
+from django.conf import settings
+
+# chave na sessão com o instante (epoch) da última renovação
+CHAVE_RENOVACAO = "_renovada_em"
+
+
+class RenovarSessaoMiddleware:
+    """
+    Expiração deslizante sem gravar a sessão a cada request (substitui
+    SESSION_SAVE_EVERY_REQUEST). A sessão só é salva quando foi alterada
+    ou quando a última renovação passou de SESSION_REFRESH_INTERVAL
+    segundos; salvar renova o prazo de SESSION_COOKIE_AGE no backend e
+    no cookie. Funciona com db, cached_db e signed_cookies.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+
+        response = self.get_response(request)
+
+        sessao = getattr(request, "session", None)
+
+        if sessao is None or sessao.is_empty():
+            return response
+
+        agora = int(time.time())
+        intervalo = getattr(settings, "SESSION_REFRESH_INTERVAL", 300)
+
+        if sessao.modified or agora - sessao.get(CHAVE_RENOVACAO, 0) >= intervalo:
+            # marca a sessão como alterada: o SessionMiddleware salva
+            sessao[CHAVE_RENOVACAO] = agora
+
+        return response
@@ -5,6 +5,13 @@ from datetime import timedelta
 
 AUTH_USER_MODEL = "home.User"
 
+# CPFBackend autentica por CPF (ou username); o ModelBackend fica para as
+# sessões já abertas com ele.
+AUTHENTICATION_BACKENDS = [
+    "home.auth_backends.CPFBackend",
+    "django.contrib.auth.backends.ModelBackend",
+]
+
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
 SECRET_KEY = os.environ.get("SECRET_KEY", "changeme")
@@ -34,6 +41,7 @@ MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
+    "plantao_pro.middleware.sessao.RenovarSessaoMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
 
@@ -84,7 +92,7 @@ DATABASES = {
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "api.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
@@ -99,8 +107,63 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
 
+# Cache padrão. Sem CACHE_BACKEND fica o locmem do Django, um por processo
+# (cada worker do gunicorn tem o seu e invalidações não se propagam). Para
+# um cache compartilhado, p.ex. CACHE_BACKEND=
+# django.core.cache.backends.redis.RedisCache e
+# CACHE_LOCATION=redis://redis:6379/1 (requer o pacote redis).
+# Sem ele, os papéis do usuário (home/roles.py) não ficam em cache entre
+# requests: são recalculados a cada request, assim como as atribuições
+# do professor na API (api/atribuicoes.py). Os contadores de falhas de
+# login (home/login_protecao.py, LOGIN_MAX_FALHAS_CPF=5 e
+# LOGIN_MAX_FALHAS_IP=30) também ficam por worker: o limite efetivo é
+# multiplicado pelo número de workers do gunicorn (x3).
+
+# Quantos proxies reversos confiáveis ficam na frente do gunicorn (ex.: 1
+# com um nginx). O limite de falhas de login por IP usa o endereço que o
+# proxy mais externo acrescentou ao X-Forwarded-For; com 0, REMOTE_ADDR.
+PROXIES_CONFIAVEIS = int(os.environ.get("PROXIES_CONFIAVEIS", "0"))
+if os.environ.get("CACHE_BACKEND"):
+    CACHES = {
+        "default": {
+            "BACKEND": os.environ["CACHE_BACKEND"],
+            "LOCATION": os.environ.get("CACHE_LOCATION", ""),
+        }
+    }
+
+# KPIs do painel financeiro (financeiro/services/kpis.py). Com cache por
+# processo, só o worker que atendeu a baixa/estorno/geração descarta os
+# KPIs; os demais mostram totais antigos por até KPIS_CACHE_TIMEOUT
+# segundos, por isso o padrão cai para 30s sem CACHE_BACKEND.
+KPIS_CACHE_TIMEOUT = int(os.environ.get(
+    "KPIS_CACHE_TIMEOUT",
+    3600 if os.environ.get("CACHE_BACKEND") else 30,
+))
+
+# Segundos que o usuário de um token JWT fica em cache no processo
+# (api/authentication.py).
+JWT_USER_CACHE_TTL = int(os.environ.get("JWT_USER_CACHE_TTL", "60"))
+
+# Logs de auditoria gravados por uma thread em segundo plano em vez de
+# no fim da request (opcional; os logs pendentes se perdem se o processo
+# for morto antes de gravar).
+AUDITORIA_ESCRITA_ASSINCRONA = os.environ.get("AUDITORIA_ESCRITA_ASSINCRONA", "0") == "1"
+
 SESSION_COOKIE_AGE = 7200
-SESSION_SAVE_EVERY_REQUEST = True
+
+# Expiração deslizante com no máximo uma gravação a cada
+# SESSION_REFRESH_INTERVAL segundos (plantao_pro/middleware/sessao.py),
+# em vez de SESSION_SAVE_EVERY_REQUEST.
+SESSION_REFRESH_INTERVAL = int(os.environ.get("SESSION_REFRESH_INTERVAL", 300))
+
+# Com um CACHES compartilhado entre os workers (Redis/Memcached), use
+# SESSION_ENGINE=django.contrib.sessions.backends.cached_db; para sessões
+# sem banco, django.contrib.sessions.backends.signed_cookies. O cache
+# padrão (locmem) é por processo, então o default continua db.
+SESSION_ENGINE = os.environ.get(
+    "SESSION_ENGINE",
+    "django.contrib.sessions.backends.db",
+)
 
 TIME_ZONE = 'America/Sao_Paulo'
 USE_TZ = True
@@ -7,6 +7,7 @@ urlpatterns = [
     path('', include('home.urls')),
     path('admin/', admin.site.urls),
     path("financeiro/", include("financeiro.urls")),
+    path("auditoria/", include("auditoria.urls")),
 ]
 
 urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,117 @@
+"""
+Mede o tempo de import do projeto no boot de um worker (django.setup()
++ carregamento do URLconf) usando `python -X importtime`.
+
+Falha (exit 1) quando alguma biblioteca pesada que deveria ser carregada
+só sob demanda aparece no boot, ou quando o tempo total passa do limite.
+
+Uso:
+    python scripts/benchmark_importtime.py
+    python scripts/benchmark_importtime.py --limite-ms 1500 --top 30
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Bibliotecas que só devem ser importadas dentro das views que as usam
+PROIBIDAS_NO_BOOT = (
+    "matplotlib",
+    "pandas",
+    "weasyprint",
+    "openpyxl",
+    "numpy",
+)
+
+CODIGO_BOOT = (
+    "import django;"
+    "django.setup();"
+    "from django.urls import get_resolver;"
+    "get_resolver().url_patterns"
+)
+
+
+def medir_boot(settings_module):
+    env = dict(os.environ)
+    env.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+
+    resultado = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CODIGO_BOOT],
+        cwd=BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+
+    if resultado.returncode != 0:
+        print(resultado.stderr)
+        sys.exit(resultado.returncode)
+
+    modulos = []
+
+    for linha in resultado.stderr.splitlines():
+        if not linha.startswith("import time:") or "[us]" in linha:
+            continue
+
+        _, dados = linha.split(":", 1)
+        proprio, cumulativo, nome = dados.split("|")
+
+        modulos.append(
+            {
+                "nome": nome.strip(),
+                "nivel": (len(nome) - len(nome.lstrip())) // 2,
+                "proprio": int(proprio),
+                "cumulativo": int(cumulativo),
+            }
+        )
+
+    return modulos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--settings", default="plantao_pro.settings.base")
+    parser.add_argument("--limite-ms", type=float, default=None)
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    modulos = medir_boot(args.settings)
+
+    # Nível 0 = imports de topo; o cumulativo deles soma o boot inteiro
+    total_us = sum(m["cumulativo"] for m in modulos if m["nivel"] == 0)
+
+    print(f"Tempo total de import no boot: {total_us / 1000:.1f} ms\n")
+    print(f"{'cumulativo (ms)':>16}  módulo")
+
+    for m in sorted(modulos, key=lambda m: m["cumulativo"], reverse=True)[: args.top]:
+        print(f"{m['cumulativo'] / 1000:>16.1f}  {m['nome']}")
+
+    carregadas = sorted(
+        {
+            m["nome"].split(".")[0]
+            for m in modulos
+            if m["nome"].split(".")[0] in PROIBIDAS_NO_BOOT
+        }
+    )
+
+    falhou = False
+
+    if carregadas:
+        print(f"\n❌ Importadas no boot: {', '.join(carregadas)}")
+        falhou = True
+
+    if args.limite_ms is not None and total_us / 1000 > args.limite_ms:
+        print(f"\n❌ Boot acima do limite de {args.limite_ms:.0f} ms")
+        falhou = True
+
+    if falhou:
+        sys.exit(1)
+
+    print("\n✔️ Nenhuma biblioteca pesada carregada no boot")
+
+
+if __name__ == "__main__":
+    main()